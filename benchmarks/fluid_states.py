@@ -0,0 +1,72 @@
+"""Memory and construction time of fluid states and operating conditions"""
+
+import tracemalloc
+
+from koozie import fr_u
+
+from chiller.conditions import OperatingConditions
+from chiller.fluid_properties import LiquidState, PsychrometricState
+
+from benchmarks.timing import seconds_per_call
+
+NUMBER_OF_STATES = 20000
+
+EVAPORATOR_TEMPERATURE = fr_u(44.0, "°F")
+DRYBULB_TEMPERATURE = fr_u(95.0, "°F")
+WETBULB_TEMPERATURE = fr_u(75.0, "°F")
+
+
+def make_liquid_state():
+    return LiquidState(EVAPORATOR_TEMPERATURE)
+
+
+def make_liquid_state_with_flow():
+    state = LiquidState(EVAPORATOR_TEMPERATURE)
+    state.rho = 999.9  # Avoid timing the property backend
+    state.cp = 4200.0
+    state.V_dot = 0.006
+    return state
+
+
+def make_psychrometric_state():
+    return PsychrometricState(DRYBULB_TEMPERATURE, wetbulb=WETBULB_TEMPERATURE)
+
+
+def make_operating_conditions():
+    return OperatingConditions(
+        condenser_inlet=make_liquid_state(), evaporator_outlet=make_liquid_state()
+    )
+
+
+CASES = {
+    "LiquidState": make_liquid_state,
+    "LiquidState (with flow)": make_liquid_state_with_flow,
+    "PsychrometricState": make_psychrometric_state,
+    "OperatingConditions": make_operating_conditions,
+}
+
+
+def bytes_per_instance(factory, number=NUMBER_OF_STATES):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    instances = [factory() for _ in range(number)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del instances
+    return size / number
+
+
+def run():
+    results = {}
+    for name, factory in CASES.items():
+        results[name] = {
+            "bytes": bytes_per_instance(factory),
+            "seconds": seconds_per_call(factory),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'':<26}{'bytes':>10}{'µs':>10}")
+    for name, result in run().items():
+        print(f"{name:<26}{result['bytes']:>10.0f}{result['seconds'] * 1e6:>10.2f}")
@@ -0,0 +1,193 @@
+"""Evaluation, performance map, representation and serialization times per model class"""
+
+import datetime
+import os
+import tempfile
+
+from numpy import arange, cos, pi
+
+from koozie import fr_u
+
+from chiller.chiller import CondenserType
+from chiller.models import EnergyPlusEIR, TabularChiller
+from chiller.models.ashrae_90_1 import (
+    ASHRAE90_1BaselineChiller,
+    CompliancePathType,
+    CompressorType,
+)
+from chiller.serialization import FILE_FORMATS, write_file
+from chiller.library import get_capacities
+from chiller.plant import Plant
+from chiller.ratings import rate_chillers
+from chiller.simulation import simulate
+
+from benchmarks.timing import seconds_per_call
+from examples import large_office
+
+# From the Large Office Reference Building, with a cubic part load curve for the EIR model
+EIR_PART_LOAD_RATIO_COEFFICIENTS = [0.06369119, 0.58488832, 0.35280274, 0.0]
+
+
+def make_energyplus_eir():
+    return EnergyPlusEIR(
+        rated_net_evaporator_capacity=fr_u(large_office.size_tons, "ton_ref"),
+        rated_cop=large_office.cop,
+        condenser_type=large_office.condenser_type,
+        eir_temperature_coefficients=list(large_office.eir_temperature_coefficients),
+        eir_part_load_ratio_coefficients=EIR_PART_LOAD_RATIO_COEFFICIENTS,
+        capacity_temperature_coefficients=list(
+            large_office.capacity_temperature_coefficients
+        ),
+        minimum_part_load_ratio=large_office.minimum_part_load_ratio,
+        minimum_unloading_ratio=large_office.minimum_unloading_ratio,
+    )
+
+
+def make_energyplus_reformulated_eir():
+    return large_office.make_chiller()
+
+
+def make_ashrae_90_1_baseline_chiller():
+    return ASHRAE90_1BaselineChiller(
+        rated_net_evaporator_capacity=999070.745,
+        rated_cop=5.33,
+        path_type=CompliancePathType.PRM,
+        compressor_type=CompressorType.POSITIVE_DISPLACEMENT,
+        condenser_type=CondenserType.LIQUID,
+    )
+
+
+def make_tabular_chiller():
+    return TabularChiller.from_representation(
+        make_ashrae_90_1_baseline_chiller().generate_205_representation()
+    )
+
+
+MODELS = {
+    "EnergyPlusEIR": make_energyplus_eir,
+    "EnergyPlusReformulatedEIR": make_energyplus_reformulated_eir,
+    "ASHRAE90_1BaselineChiller": make_ashrae_90_1_baseline_chiller,
+    "TabularChiller": make_tabular_chiller,
+}
+
+
+def reset(chiller):
+    # Time evaluations rather than lookups of memoized solutions
+    if hasattr(chiller, "solution_cache"):
+        chiller.solution_cache.clear()
+
+
+def time_performance(chiller):
+    def evaluate():
+        reset(chiller)
+        chiller.performance(chiller.rated_operating_conditions)
+
+    return seconds_per_call(evaluate)
+
+
+def time_make_performance_map(chiller):
+    def evaluate():
+        reset(chiller)
+        chiller.make_performance_map()
+
+    return seconds_per_call(evaluate)
+
+
+def time_generate_205_representation(chiller):
+    def generate():
+        reset(chiller)
+        chiller.generate_205_representation()
+
+    return seconds_per_call(generate)
+
+
+def time_write_file(chiller, file_format):
+    representation = chiller.generate_205_representation()
+    with tempfile.TemporaryDirectory() as directory_path:
+        file_path = os.path.join(directory_path, f"representation.{file_format}")
+        return seconds_per_call(
+            lambda: write_file(representation, file_path, file_format)
+        )
+
+
+def make_year(capacity):
+    """A year of hourly loads and condenser temperatures (rounded as in weather files)"""
+    hours = arange(8760)
+    season = 0.5 - 0.5 * cos(2.0 * pi * hours / 8760.0)
+    cooling_load = capacity * season
+    condenser_entering_temperature = (
+        fr_u(65.0, "°F") + season * fr_u(20.0, "delta_degF")
+    ).round(1)
+    return cooling_load, condenser_entering_temperature
+
+
+def time_simulate(chiller):
+    cooling_load, condenser_entering_temperature = make_year(
+        chiller.rated_net_evaporator_capacity
+    )
+    return seconds_per_call(
+        lambda: simulate(
+            chiller, cooling_load, fr_u(44.0, "°F"), condenser_entering_temperature
+        )
+    )
+
+
+def time_plant_simulate(chillers):
+    plant = Plant(chillers)
+    cooling_load, condenser_entering_temperature = make_year(
+        sum(chiller.rated_net_evaporator_capacity for chiller in chillers)
+    )
+    return seconds_per_call(
+        lambda: plant.simulate(
+            cooling_load, fr_u(44.0, "°F"), condenser_entering_temperature
+        )
+    )
+
+
+def make_baseline_library(number_of_sizes):
+    return [
+        ASHRAE90_1BaselineChiller(
+            rated_net_evaporator_capacity=capacity,
+            rated_cop=curve_set.cop,
+            path_type=curve_set.path_type,
+            condenser_type=curve_set.condenser_type,
+            compressor_type=curve_set.compressor_type,
+        )
+        for curve_set in ASHRAE90_1BaselineChiller.chiller_curve_sets
+        for capacity in get_capacities(curve_set, number_of_sizes)
+    ]
+
+
+def run():
+    results = {}
+    for name, make_chiller in MODELS.items():
+        chiller = make_chiller()
+        chiller.metadata.data_timestamp = datetime.datetime(2024, 1, 1)
+        results[f"{name}.performance"] = {"seconds": time_performance(chiller)}
+        results[f"{name}.make_performance_map"] = {
+            "seconds": time_make_performance_map(chiller)
+        }
+        results[f"{name}.generate_205_representation"] = {
+            "seconds": time_generate_205_representation(chiller)
+        }
+        results[f"{name}.simulate_8760"] = {"seconds": time_simulate(chiller)}
+        for file_format in FILE_FORMATS:
+            results[f"{name}.write_file.{file_format}"] = {
+                "seconds": time_write_file(chiller, file_format)
+            }
+    results["Plant.simulate_8760"] = {
+        "seconds": time_plant_simulate(
+            [make_energyplus_eir(), make_ashrae_90_1_baseline_chiller()] * 4
+        )
+    }
+    chillers = make_baseline_library(40)
+    results[f"ratings.rate_chillers_{len(chillers)}"] = {
+        "seconds": seconds_per_call(lambda: rate_chillers(chillers))
+    }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'':<52}{'ms':>10}")
+    for name, result in run().items():
+        print(f"{name:<52}{result['seconds'] * 1e3:>10.3f}")
@@ -0,0 +1,205 @@
+"""Run the benchmarks, append the results to a history file and flag regressions.
+
+Run from the repository root: `python -m benchmarks.run` (or `doit benchmarks`).
+Each line of the history file is a JSON record of one run. Each metric is compared
+with the median of the same metric over recent runs on the same platform and Python
+version, and increases beyond the threshold of the case are reported as regressions
+(with a nonzero exit status).
+
+The history is kept in `benchmarks/history.jsonl` (commit it to share a baseline), or
+in the file given by `--history` or the CHILLER_BENCHMARK_HISTORY environment variable
+(CI keeps its own between runs).
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+from statistics import median
+
+from benchmarks import fluid_states, models
+
+SUITES = {
+    "fluid_states": fluid_states.run,
+    "models": models.run,
+}
+
+HISTORY_FILE_PATH = os.environ.get(
+    "CHILLER_BENCHMARK_HISTORY", os.path.join("benchmarks", "history.jsonl")
+)
+
+THRESHOLD = 0.2
+
+# Relative increase reported as a regression, by case name pattern (the last match applies)
+CASE_THRESHOLDS = {
+    "*.write_file.*": 0.5,  # File system bound
+}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suites(suite_names) -> dict:
+    results = {}
+    for suite_name in suite_names:
+        for case_name, metrics in SUITES[suite_name]().items():
+            results[f"{suite_name}.{case_name}"] = metrics
+    return results
+
+
+def read_history(file_path: str) -> list[dict]:
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def append_history(file_path: str, record: dict):
+    directory_path = os.path.dirname(file_path)
+    if directory_path:
+        os.makedirs(directory_path, exist_ok=True)
+    with open(file_path, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+
+def platform_key() -> dict:
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+    }
+
+
+def case_threshold(case_name: str, case_thresholds: dict, threshold: float) -> float:
+    for pattern, case_threshold in case_thresholds.items():
+        if fnmatch.fnmatchcase(case_name, pattern):
+            threshold = case_threshold
+    return threshold
+
+
+def find_regressions(
+    results: dict,
+    history: list[dict],
+    threshold: float,
+    window: int,
+    case_thresholds: dict | None = None,
+) -> list[tuple[str, str, float, float]]:
+    """(case, metric, reference, value) for each metric more than the threshold of the
+    case (relative) above the median of the last 'window' runs that measured it"""
+    if case_thresholds is None:
+        case_thresholds = CASE_THRESHOLDS
+    regressions = []
+    for case_name, metrics in results.items():
+        limit = 1.0 + case_threshold(case_name, case_thresholds, threshold)
+        for metric, value in metrics.items():
+            previous_values = [
+                record["results"][case_name][metric]
+                for record in history
+                if metric in record["results"].get(case_name, {})
+            ][-window:]
+            if len(previous_values) == 0:
+                continue
+            reference = median(previous_values)
+            if value > reference * limit:
+                regressions.append((case_name, metric, reference, value))
+    return regressions
+
+
+def parse_case_threshold(argument: str) -> tuple[str, float]:
+    pattern, _, threshold = argument.rpartition("=")
+    if not pattern:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=THRESHOLD, got '{argument}'")
+    return pattern, float(threshold)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-s",
+        "--suite",
+        action="append",
+        choices=list(SUITES),
+        help="Suite to run (default: all)",
+    )
+    parser.add_argument(
+        "--history",
+        default=HISTORY_FILE_PATH,
+        help=f"History file (default: {HISTORY_FILE_PATH})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Relative increase over recent runs reported as a regression",
+    )
+    parser.add_argument(
+        "--case-threshold",
+        action="append",
+        type=parse_case_threshold,
+        default=[],
+        metavar="PATTERN=THRESHOLD",
+        help="Threshold of the cases matching a pattern (e.g., 'models.*.performance=0.3')",
+    )
+    parser.add_argument(
+        "--window", type=int, default=5, help="Number of recent runs compared"
+    )
+    parser.add_argument(
+        "--no-record", action="store_true", help="Do not add this run to the history"
+    )
+    arguments = parser.parse_args(argv)
+
+    environment = platform_key()
+    history = [
+        record
+        for record in read_history(arguments.history)
+        if all(record.get(key) == value for key, value in environment.items())
+    ]
+    results = run_suites(arguments.suite or list(SUITES))
+    regressions = find_regressions(
+        results,
+        history,
+        arguments.threshold,
+        arguments.window,
+        {**CASE_THRESHOLDS, **dict(arguments.case_threshold)},
+    )
+
+    print(f"{'':<64}{'value':>12}")
+    for case_name, metrics in results.items():
+        for metric, value in metrics.items():
+            print(f"{case_name + ' [' + metric + ']':<64}{value:>12.4g}")
+
+    if not arguments.no_record:
+        append_history(
+            arguments.history,
+            {
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(
+                    "T", "seconds"
+                ),
+                "commit": git_commit(),
+                **environment,
+                "results": results,
+            },
+        )
+
+    for case_name, metric, reference, value in regressions:
+        print(
+            f"REGRESSION {case_name} [{metric}]: {value:.4g} vs. {reference:.4g} ({value / reference - 1.0:+.0%})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""Timing of benchmark cases"""
+
+import timeit
+
+MINIMUM_TIME = 0.2  # s
+
+
+def seconds_per_call(function, repeat=5, minimum_time=MINIMUM_TIME):
+    """Best time per call over 'repeat' loops, each calling the function enough times to
+    run for at least 'minimum_time' (so that sub-millisecond cases are not dominated by
+    timer resolution and scheduling noise)"""
+    timer = timeit.Timer(function)
+    number = 1
+    while (time := timer.timeit(number)) < minimum_time:
+        if time > 0.0:
+            number = max(2 * number, int(1.2 * number * minimum_time / time))
+        else:
+            number *= 10
+    return min(timer.repeat(repeat=repeat, number=number)) / number
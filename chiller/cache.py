@@ -0,0 +1,151 @@
+import os
+from hashlib import sha256
+from tempfile import mkstemp
+from threading import Lock
+
+from numpy import dtype as numpy_dtype, load, savez
+from numpy.typing import DTypeLike
+
+from .fluid_properties import LiquidState
+from .performance_map import PerformanceMap
+from .util import CacheInfo
+
+# Increment when changes to the models alter generated performance maps
+CACHE_FORMAT_VERSION = 1
+
+GRID_PREFIX = "grid:"
+LOOKUP_PREFIX = "lookup:"
+
+
+class PerformanceMapCache:
+    """Content-addressed directory of performance maps shared across processes.
+
+    Maps are stored as .npz files named by a hash of everything that determines them
+    (the chiller's performance characteristics, the map specification, the storage type
+    and the liquid property backend and its tables). When the directory grows past 'max_size' bytes,
+    the least recently used maps are removed.
+    """
+
+    def __init__(self, directory_path: str, max_size: int = 1 << 30):
+        self.directory_path = directory_path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        os.makedirs(directory_path, exist_ok=True)
+
+    def key(self, chiller, specification, dtype: DTypeLike) -> str:
+        characteristics = (
+            CACHE_FORMAT_VERSION,
+            chiller.performance_characteristics(),
+            specification,
+            numpy_dtype(dtype).str,
+            LiquidState.properties.characteristics(),
+        )
+        return sha256(f"{characteristics}".encode()).hexdigest()
+
+    def file_path(self, key: str) -> str:
+        return os.path.join(self.directory_path, f"{key}.npz")
+
+    def get(self, key: str) -> PerformanceMap | None:
+        file_path = self.file_path(key)
+        try:
+            with load(file_path, allow_pickle=False) as arrays:
+                grid_variables = {}
+                lookup_variables = {}
+                for name in arrays.files:
+                    if name.startswith(GRID_PREFIX):
+                        grid_variables[name[len(GRID_PREFIX) :]] = arrays[name]
+                    else:
+                        lookup_variables[name[len(LOOKUP_PREFIX) :]] = arrays[name]
+            os.utime(file_path)  # Mark as recently used
+        except (OSError, ValueError):
+            # Missing, or removed or corrupted by another process
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        lookup_dtype = next(
+            (
+                values.dtype
+                for values in lookup_variables.values()
+                if values.dtype.kind == "f"
+            ),
+            numpy_dtype(float),
+        )
+        return PerformanceMap(grid_variables, lookup_variables, lookup_dtype)
+
+    def put(self, key: str, performance_map: PerformanceMap):
+        arrays = {
+            f"{GRID_PREFIX}{name}": values
+            for name, values in performance_map.grid_variables.items()
+        }
+        arrays.update(
+            {
+                f"{LOOKUP_PREFIX}{name}": values
+                for name, values in performance_map.lookup_variables.items()
+            }
+        )
+        # Write to a temporary file first so other processes never read a partial map
+        file_descriptor, temporary_file_path = mkstemp(
+            prefix=f".{key}.", suffix=".npz", dir=self.directory_path
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                savez(file, **arrays)
+            os.replace(temporary_file_path, self.file_path(key))
+        except BaseException:
+            if os.path.exists(temporary_file_path):
+                os.remove(temporary_file_path)
+            raise
+        self.evict()
+
+    def entries(self) -> list[os.DirEntry]:
+        return [
+            entry
+            for entry in os.scandir(self.directory_path)
+            if entry.name.endswith(".npz") and not entry.name.startswith(".")
+        ]
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self):
+        """Remove the least recently used maps until the directory fits in 'max_size'"""
+        entries = sorted(self.entries(), key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_size:
+                break
+            try:
+                size -= entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # Already removed by another process
+
+    def clear(self):
+        for entry in self.entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Hits and misses in this process, and sizes in bytes"""
+        return CacheInfo(self.hits, self.misses, self.max_size, self.size())
+
+    def __len__(self):
+        return len(self.entries())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
@@ -1,28 +1,66 @@
 from enum import Enum
+from concurrent.futures import Executor
 import uuid
 import datetime
+from hashlib import sha256
+from itertools import repeat
 from random import Random
 from copy import deepcopy
-from typing import NamedTuple
+from typing import Iterator, NamedTuple
 
-from numpy import linspace
+from numpy import array, asarray, broadcast_arrays, float64, full, linspace
+from numpy.typing import ArrayLike, DTypeLike, NDArray
 
 from koozie import fr_u
 
+from . import instrumentation
 from .fluid_properties import LiquidState, PsychrometricState
+from .units import cfm_per_ton_ref
 from .conditions import (
     AHRI_550_590_LIQUID_COOLED_CONDITIONS,
     AHRI_550_590_LIQUID_COOLED_CONDENSER_OUTLET,
     AHRI_550_590_AIR_COOLED_CONDITIONS,
     AHRI_550_590_EVAPORATOR_INLET,
     OperatingConditions,
+    ConditionGrid,
 )
+from .performance_map import PerformanceMap
+from .serialization import SpooledArray
 
 
 class FloatRange(NamedTuple):
     min: float|None
     max: float|None
 
+
+class ChillerPerformance(NamedTuple):
+    """Outputs of a chiller model at one or more operating conditions (scalars or arrays)"""
+
+    net_evaporator_capacity: float | NDArray
+    input_power: float | NDArray
+    net_condenser_capacity: float | NDArray
+    oil_cooler_heat: float | NDArray
+    auxiliary_heat: float | NDArray
+    space_loss_heat: float | NDArray
+
+
+class PerformanceMapSpecification(NamedTuple):
+    """Resolution of the generated cooling performance map.
+
+    Temperatures are spaced evenly over the chiller's application ranges. Flow rates
+    are given as fractions of the rated flow rates. Every compressor speed is included.
+    """
+
+    number_of_evaporator_leaving_temperatures: int = 4
+    number_of_condenser_entering_temperatures: int = 4
+    evaporator_flow_fractions: tuple[float, ...] = (1.0,)
+    condenser_flow_fractions: tuple[float, ...] = (1.0,)  # Liquid-cooled only
+
+
+# Number of grid points evaluated at a time when streaming performance maps
+PERFORMANCE_MAP_CHUNK_SIZE = 4096
+
+
 class CondenserType(Enum):
     LIQUID = 1
     AIR = 2
@@ -55,14 +93,16 @@ class ChillerMetadata:
         has_hot_gas_bypass_installed=False,
         uuid_seed=None,
         data_version=1,
+        data_timestamp: datetime.datetime | None = None,
     ):
 
         self.description = description
         self.data_source = data_source
         self.notes = notes
         self.has_hot_gas_bypass_installed = has_hot_gas_bypass_installed
-        self.uuid_seed = uuid_seed
+        self.uuid_seed = uuid_seed  # Derived from the chiller's characteristics if None
         self.data_version = data_version
+        self.data_timestamp = data_timestamp  # Time of generation if None
 
 
 class Chiller:
@@ -104,6 +144,8 @@ class Chiller:
         self.set_rated_evaporator_volumetric_flow_rate()
 
         self.metadata = ChillerMetadata()
+        self.performance_map_specification = PerformanceMapSpecification()
+        self.performance_map_cache = None  # e.g., a cache.PerformanceMapCache
 
     def net_evaporator_capacity(self, conditions):
         raise NotImplementedError()
@@ -120,10 +162,102 @@ class Chiller:
     def auxiliary_heat(self, conditions):
         raise NotImplementedError()
 
+    def performance(self, conditions) -> ChillerPerformance:
+        """Evaluate every output at once for a single set of conditions"""
+        net_evaporator_capacity = self.net_evaporator_capacity(conditions)
+        input_power = self.input_power(conditions)
+        net_condenser_capacity = self.net_condenser_capacity(conditions)
+        oil_cooler_heat = self.oil_cooler_heat(conditions)
+        auxiliary_heat = self.auxiliary_heat(conditions)
+        return ChillerPerformance(
+            net_evaporator_capacity=net_evaporator_capacity,
+            input_power=input_power,
+            net_condenser_capacity=net_condenser_capacity,
+            oil_cooler_heat=oil_cooler_heat,
+            auxiliary_heat=auxiliary_heat,
+            space_loss_heat=(input_power + net_evaporator_capacity)
+            - (net_condenser_capacity + oil_cooler_heat + auxiliary_heat),
+        )
+
+    @instrumentation.timed
+    def evaluate_conditions(
+        self, conditions_list: list[OperatingConditions], executor: Executor | None = None
+    ) -> list[ChillerPerformance]:
+        """Evaluate the performance at each set of conditions, optionally spread across
+        the workers of an executor (e.g., a ThreadPoolExecutor or ProcessPoolExecutor)."""
+        if executor is None:
+            return [self.performance(conditions) for conditions in conditions_list]
+        return list(
+            executor.map(
+                self.performance,
+                conditions_list,
+                chunksize=max(1, len(conditions_list) // 64),
+            )
+        )
+
+    @instrumentation.timed
+    def evaluate_grid(
+        self, grid: ConditionGrid, start: int = 0, stop: int | None = None
+    ) -> ChillerPerformance:
+        """Evaluate every output at grid points [start, stop) as arrays.
+
+        This builds the operating conditions for each point. Vectorized models override
+        it to evaluate the grid columns directly.
+        """
+        performances = self.evaluate_conditions(list(grid.conditions(start, stop)))
+        return ChillerPerformance(*(array(values) for values in zip(*performances)))
+
+    def operating_conditions(
+        self,
+        evaporator_leaving_temperature: float,
+        condenser_entering_temperature: float,
+        compressor_speed: int = 0,
+    ) -> OperatingConditions:
+        """Conditions at the given temperatures (K) and the rated flow rates"""
+        raise NotImplementedError()
+
+    def evaluate_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+    ) -> ChillerPerformance:
+        """Evaluate every output for arrays of conditions in a single call.
+
+        Inputs are broadcast against each other. Temperatures are in K. Vectorized
+        models override this; otherwise, the points are evaluated one at a time.
+        """
+        (
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            compressor_speed,
+        ) = broadcast_arrays(
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+            asarray(compressor_speed, dtype=int),
+        )
+        performances = self.evaluate_conditions(
+            [
+                self.operating_conditions(*point)
+                for point in zip(
+                    evaporator_leaving_temperature.ravel().tolist(),
+                    condenser_entering_temperature.ravel().tolist(),
+                    compressor_speed.ravel().tolist(),
+                )
+            ]
+        )
+        return ChillerPerformance(
+            *(
+                array(values, dtype=float).reshape(compressor_speed.shape)
+                for values in zip(*performances)
+            )
+        )
+
     def cop(self, conditions=None):
         if conditions is None:
             conditions = self.get_default_conditions()
-        return self.net_evaporator_capacity(conditions) / self.input_power(conditions)
+        performance = self.performance(conditions)
+        return performance.net_evaporator_capacity / performance.input_power
 
     def condenser_liquid_leaving_state(self, conditions):
         raise NotImplementedError()
@@ -134,13 +268,7 @@ class Chiller:
         )
 
     def space_loss_heat(self, conditions):
-        return (
-            self.input_power(conditions) + self.net_evaporator_capacity(conditions)
-        ) - (
-            self.net_condenser_capacity(conditions)
-            + self.oil_cooler_heat(conditions)
-            + self.auxiliary_heat(conditions)
-        )
+        return self.performance(conditions).space_loss_heat
 
     def set_rated_evaporator_volumetric_flow_rate(self):
         delta_T = (
@@ -153,22 +281,58 @@ class Chiller:
         self.rated_operating_conditions.evaporator_outlet.m_dot = m_dot
         self.rated_evaporator_inlet_state.m_dot = m_dot
 
+    def performance_characteristics(self) -> tuple:
+        """Inputs that determine the chiller's performance"""
+        return (
+            type(self).__name__,
+            self.rated_net_evaporator_capacity,
+            self.rated_cop,
+            self.rated_net_condenser_capacity,
+            self.cycling_degradation_coefficient,
+            self.standby_power,
+            self.number_of_compressor_speeds,
+            self.condenser_type,
+            self.compressor_type,
+            self.evaporator_leaving_temperature_range,
+            self.condenser_entering_temperature_range,
+        )
+
+    def unique_characteristics(self) -> tuple:
+        """Inputs that determine the generated representation (used to derive its ID)"""
+        return self.performance_characteristics() + (
+            self.performance_map_specification,
+            self.metadata.description,
+            self.metadata.data_version,
+        )
+
     def get_default_conditions(self):
         if self.condenser_type == CondenserType.LIQUID:
             return AHRI_550_590_LIQUID_COOLED_CONDITIONS
         else:
             return AHRI_550_590_AIR_COOLED_CONDITIONS
 
+    @instrumentation.timed
     def generate_205_representation(
         self,
         capacity_range: FloatRange = FloatRange(None, None),
+        spool_lookup_variables: bool = False,
     ) -> dict:
+        """Generate an RS0001 representation.
+
+        With 'spool_lookup_variables', the cooling performance map's lookup variables are
+        SpooledArrays (or cached arrays) instead of lists, to be written by the
+        'serialization' module.
+        """
         # Metadata
-        timestamp = datetime.datetime.now().isoformat("T", "minutes")
-        rnd = Random()
+        if self.metadata.data_timestamp is None:
+            timestamp = datetime.datetime.now().isoformat("T", "minutes")
+        else:
+            timestamp = self.metadata.data_timestamp.isoformat("T", "minutes")
         if self.metadata.uuid_seed is None:
-            self.metadata.uuid_seed = hash(self)
-        rnd.seed(self.metadata.uuid_seed)
+            uuid_seed = sha256(f"{self.unique_characteristics()}".encode()).hexdigest()
+        else:
+            uuid_seed = self.metadata.uuid_seed
+        rnd = Random(uuid_seed)
         unique_id = str(uuid.UUID(int=rnd.getrandbits(128), version=4))
 
         metadata = {
@@ -195,7 +359,15 @@ class Chiller:
                 compressor_type_map[self.compressor_type]
             )
 
-        performance_map_cooling = self.make_performance_map()
+        if spool_lookup_variables and self.performance_map_cache is not None:
+            # Cached arrays are written directly
+            performance_map_cooling = self.make_performance_map().to_dict(
+                lookup_variables_as_lists=False
+            )
+        elif spool_lookup_variables:
+            performance_map_cooling = self.spool_performance_map()
+        else:
+            performance_map_cooling = self.make_performance_map().to_dict()
 
         evaporator_liquid_volumetric_flow_rates = performance_map_cooling[
             "grid_variables"
@@ -312,9 +484,92 @@ class Chiller:
 
         return representation
 
-    def make_performance_map(self):
+    def make_condition_grid(
+        self, specification: PerformanceMapSpecification | None = None
+    ) -> ConditionGrid:
+        raise NotImplementedError()
+
+    def grid_point_conditions(self, point: dict) -> OperatingConditions:
         raise NotImplementedError()
 
+    def lookup_variables(
+        self, grid: ConditionGrid, start: int = 0, stop: int | None = None
+    ) -> dict[str, NDArray]:
+        raise NotImplementedError()
+
+    def lookup_variable_chunks(
+        self,
+        grid: ConditionGrid,
+        chunk_size: int = PERFORMANCE_MAP_CHUNK_SIZE,
+        executor: Executor | None = None,
+    ) -> Iterator[dict[str, NDArray]]:
+        """Lookup variables for consecutive blocks of at most 'chunk_size' grid points.
+
+        With an executor (e.g., a ThreadPoolExecutor or ProcessPoolExecutor), the blocks
+        are evaluated by its workers, each running the (vectorized) 'evaluate_grid' on
+        one block. Blocks are yielded in grid order.
+        """
+        starts = range(0, grid.size, chunk_size)
+        stops = [min(start + chunk_size, grid.size) for start in starts]
+        if executor is None:
+            for start, stop in zip(starts, stops):
+                yield self.lookup_variables(grid, start, stop)
+        else:
+            yield from executor.map(self.lookup_variables, repeat(grid), starts, stops)
+
+    @instrumentation.timed
+    def make_performance_map(
+        self,
+        executor: Executor | None = None,
+        specification: PerformanceMapSpecification | None = None,
+        chunk_size: int = PERFORMANCE_MAP_CHUNK_SIZE,
+        dtype: DTypeLike = float64,
+        cache=None,
+    ) -> PerformanceMap:
+        """Evaluate the cooling performance map. Maps are reused from 'cache' (by default,
+        the chiller's 'performance_map_cache') when one is available. With an executor,
+        blocks of 'chunk_size' grid points are evaluated by its workers (see
+        'lookup_variable_chunks')."""
+        if specification is None:
+            specification = self.performance_map_specification
+        if cache is None:
+            cache = self.performance_map_cache
+        if cache is not None:
+            key = cache.key(self, specification, dtype)
+            performance_map = cache.get(key)
+            if performance_map is not None:
+                return performance_map
+
+        grid = self.make_condition_grid(specification)
+        performance_map = PerformanceMap.from_chunks(
+            grid, self.lookup_variable_chunks(grid, chunk_size, executor), dtype
+        )
+        if cache is not None:
+            cache.put(key, performance_map)
+        return performance_map
+
+    @instrumentation.timed
+    def spool_performance_map(
+        self,
+        executor: Executor | None = None,
+        specification: PerformanceMapSpecification | None = None,
+        chunk_size: int = PERFORMANCE_MAP_CHUNK_SIZE,
+    ) -> dict:
+        """Performance map in RS0001 layout with each lookup variable spooled to a
+        SpooledArray as it is evaluated"""
+        grid = self.make_condition_grid(specification)
+        lookup_variables: dict[str, SpooledArray] = {}
+        for chunk in self.lookup_variable_chunks(grid, chunk_size, executor):
+            for name, values in chunk.items():
+                if name not in lookup_variables:
+                    lookup_variables[name] = SpooledArray(values.dtype)
+                lookup_variables[name].append(values)
+
+        return {
+            "grid_variables": grid.grid_variables(),
+            "lookup_variables": lookup_variables,
+        }
+
 
 class LiquidCooledChiller(Chiller):
     DEFAULT_CONDENSER_TEMPERATURE_RANGE = FloatRange(
@@ -333,6 +588,10 @@ class LiquidCooledChiller(Chiller):
         condenser_entering_temperature_range=DEFAULT_CONDENSER_TEMPERATURE_RANGE,
         compressor_type=CompressorType.UNKNOWN,
     ):
+        # Set before the rated evaporator flow rate is calculated
+        self.rated_operating_conditions = deepcopy(
+            AHRI_550_590_LIQUID_COOLED_CONDITIONS
+        )
         super().__init__(
             rated_net_evaporator_capacity=rated_net_evaporator_capacity,
             rated_cop=rated_cop,
@@ -344,9 +603,6 @@ class LiquidCooledChiller(Chiller):
             condenser_type=CondenserType.LIQUID,
             compressor_type=compressor_type,
         )
-        self.rated_operating_conditions = deepcopy(
-            AHRI_550_590_LIQUID_COOLED_CONDITIONS
-        )
         self.rated_condenser_outlet_state = deepcopy(
             AHRI_550_590_LIQUID_COOLED_CONDENSER_OUTLET
         )
@@ -396,83 +652,88 @@ class LiquidCooledChiller(Chiller):
         self.rated_operating_conditions.condenser_inlet.m_dot = m_dot
         self.rated_condenser_outlet_state.m_dot = m_dot
 
-    def make_performance_map(self) -> dict:
-        # Create conditions
+    def operating_conditions(
+        self,
+        evaporator_leaving_temperature: float,
+        condenser_entering_temperature: float,
+        compressor_speed: int = 0,
+    ) -> OperatingConditions:
+        return OperatingConditions(
+            evaporator_outlet=LiquidState(
+                temperature=evaporator_leaving_temperature,
+                volumetric_flow_rate=self.rated_operating_conditions.evaporator_outlet.V_dot,
+            ),
+            condenser_inlet=LiquidState(
+                temperature=condenser_entering_temperature,
+                volumetric_flow_rate=self.rated_operating_conditions.condenser_inlet.V_dot,
+            ),
+            compressor_speed=compressor_speed,
+        )
+
+    def make_condition_grid(
+        self, specification: PerformanceMapSpecification | None = None
+    ) -> ConditionGrid:
+        if specification is None:
+            specification = self.performance_map_specification
         evaporator_liquid_volumetric_flow_rates = [
-            self.rated_operating_conditions.evaporator_outlet.V_dot
+            self.rated_operating_conditions.evaporator_outlet.V_dot * fraction
+            for fraction in specification.evaporator_flow_fractions
         ]
         evaporator_liquid_leaving_temperatures = linspace(
             self.evaporator_leaving_temperature_range.min,
             self.evaporator_leaving_temperature_range.max,
-            4,
-        ).tolist()
+            specification.number_of_evaporator_leaving_temperatures,
+        )
         compressor_sequence_numbers = list(
             range(1, self.number_of_compressor_speeds + 1)
         )
 
         condenser_liquid_volumetric_flow_rates = [
-            self.rated_operating_conditions.condenser_inlet.V_dot
+            self.rated_operating_conditions.condenser_inlet.V_dot * fraction
+            for fraction in specification.condenser_flow_fractions
         ]
         condenser_liquid_entering_temperatures = linspace(
             self.condenser_entering_temperature_range.min,
             self.condenser_entering_temperature_range.max,
-            4,
-        ).tolist()
-        grid_variables = {
-            "evaporator_liquid_volumetric_flow_rate": evaporator_liquid_volumetric_flow_rates,
-            "evaporator_liquid_leaving_temperature": evaporator_liquid_leaving_temperatures,
-            "condenser_liquid_volumetric_flow_rate": condenser_liquid_volumetric_flow_rates,
-            "condenser_liquid_entering_temperature": condenser_liquid_entering_temperatures,
-            "compressor_sequence_number": compressor_sequence_numbers,
-        }
+            specification.number_of_condenser_entering_temperatures,
+        )
+        return ConditionGrid(
+            {
+                "evaporator_liquid_volumetric_flow_rate": evaporator_liquid_volumetric_flow_rates,
+                "evaporator_liquid_leaving_temperature": evaporator_liquid_leaving_temperatures,
+                "condenser_liquid_volumetric_flow_rate": condenser_liquid_volumetric_flow_rates,
+                "condenser_liquid_entering_temperature": condenser_liquid_entering_temperatures,
+                "compressor_sequence_number": compressor_sequence_numbers,
+            },
+            self.grid_point_conditions,
+        )
 
-        input_powers = []
-        net_evaporator_capacities = []
-        net_condenser_capacities = []
-        oil_cooler_heats = []
-        auxiliary_heats = []
-        operation_states = []
-
-        for v_evap in evaporator_liquid_volumetric_flow_rates:
-            for t_evap in evaporator_liquid_leaving_temperatures:
-                for v_cond in condenser_liquid_volumetric_flow_rates:
-                    for t_cond in condenser_liquid_entering_temperatures:
-                        for speed in [
-                            self.number_of_compressor_speeds - n
-                            for n in compressor_sequence_numbers
-                        ]:
-                            conditions = OperatingConditions(
-                                evaporator_outlet=LiquidState(
-                                    temperature=t_evap, volumetric_flow_rate=v_evap
-                                ),
-                                condenser_inlet=LiquidState(
-                                    temperature=t_cond, volumetric_flow_rate=v_cond
-                                ),
-                                compressor_speed=speed,
-                            )
-
-                            input_powers.append(self.input_power(conditions))
-                            net_evaporator_capacities.append(
-                                self.net_evaporator_capacity(conditions)
-                            )
-                            net_condenser_capacities.append(
-                                self.net_condenser_capacity(conditions)
-                            )
-                            oil_cooler_heats.append(self.oil_cooler_heat(conditions))
-                            auxiliary_heats.append(self.auxiliary_heat(conditions))
-                            operation_states.append("NORMAL")
-        lookup_variables = {
-            "input_power": input_powers,
-            "net_evaporator_capacity": net_evaporator_capacities,
-            "net_condenser_capacity": net_condenser_capacities,
-            "oil_cooler_heat": oil_cooler_heats,
-            "auxiliary_heat": auxiliary_heats,
-            "operation_state": operation_states,
-        }
+    def grid_point_conditions(self, point: dict) -> OperatingConditions:
+        return OperatingConditions(
+            evaporator_outlet=LiquidState(
+                temperature=point["evaporator_liquid_leaving_temperature"],
+                volumetric_flow_rate=point["evaporator_liquid_volumetric_flow_rate"],
+            ),
+            condenser_inlet=LiquidState(
+                temperature=point["condenser_liquid_entering_temperature"],
+                volumetric_flow_rate=point["condenser_liquid_volumetric_flow_rate"],
+            ),
+            compressor_speed=self.number_of_compressor_speeds
+            - point["compressor_sequence_number"],
+        )
 
+    @instrumentation.timed
+    def lookup_variables(
+        self, grid: ConditionGrid, start: int = 0, stop: int | None = None
+    ) -> dict[str, NDArray]:
+        performance = self.evaluate_grid(grid, start, stop)
         return {
-            "grid_variables": grid_variables,
-            "lookup_variables": lookup_variables,
+            "input_power": performance.input_power,
+            "net_evaporator_capacity": performance.net_evaporator_capacity,
+            "net_condenser_capacity": performance.net_condenser_capacity,
+            "oil_cooler_heat": performance.oil_cooler_heat,
+            "auxiliary_heat": performance.auxiliary_heat,
+            "operation_state": full(len(performance.input_power), "NORMAL"),
         }
 
 
@@ -497,6 +758,8 @@ class AirCooledChiller(Chiller):
         condenser_entering_temperature_range=None,
         compressor_type=CompressorType.UNKNOWN,
     ):
+        # Set before the rated evaporator flow rate is calculated
+        self.rated_operating_conditions = deepcopy(AHRI_550_590_AIR_COOLED_CONDITIONS)
         super().__init__(
             rated_net_evaporator_capacity,
             rated_cop,
@@ -510,8 +773,6 @@ class AirCooledChiller(Chiller):
             compressor_type,
         )
 
-        self.rated_operating_conditions = deepcopy(AHRI_550_590_AIR_COOLED_CONDITIONS)
-
     def condenser_air_volumetric_flow_rate(
         self, conditions: OperatingConditions | None = None
     ) -> float:
@@ -523,7 +784,7 @@ class AirCooledChiller(Chiller):
             evaporator_outlet=self.rated_operating_conditions.evaporator_outlet,
             compressor_speed=speed,
         )
-        return fr_u(900, "cfm/ton_ref") * self.net_evaporator_capacity(
+        return cfm_per_ton_ref.fr_u(900.0) * self.net_evaporator_capacity(
             rated_conditions_at_speed
         )
 
@@ -532,16 +793,39 @@ class AirCooledChiller(Chiller):
             conditions = self.rated_operating_conditions
         return 0.0
 
-    def make_performance_map(self) -> dict:
-        # Create conditions
+    def operating_conditions(
+        self,
+        evaporator_leaving_temperature: float,
+        condenser_entering_temperature: float,
+        compressor_speed: int = 0,
+    ) -> OperatingConditions:
+        return OperatingConditions(
+            evaporator_outlet=LiquidState(
+                temperature=evaporator_leaving_temperature,
+                volumetric_flow_rate=self.rated_operating_conditions.evaporator_outlet.V_dot,
+            ),
+            condenser_inlet=PsychrometricState(
+                drybulb=condenser_entering_temperature,
+                relative_humidity=0.4,
+                pressure=self.rated_operating_conditions.condenser_inlet.p,
+            ),
+            compressor_speed=compressor_speed,
+        )
+
+    def make_condition_grid(
+        self, specification: PerformanceMapSpecification | None = None
+    ) -> ConditionGrid:
+        if specification is None:
+            specification = self.performance_map_specification
         evaporator_liquid_volumetric_flow_rates = [
-            self.rated_operating_conditions.evaporator_outlet.V_dot
+            self.rated_operating_conditions.evaporator_outlet.V_dot * fraction
+            for fraction in specification.evaporator_flow_fractions
         ]
         evaporator_liquid_leaving_temperatures = linspace(
             self.evaporator_leaving_temperature_range.min,
             self.evaporator_leaving_temperature_range.max,
-            4,
-        ).tolist()
+            specification.number_of_evaporator_leaving_temperatures,
+        )
         compressor_sequence_numbers = list(
             range(1, self.number_of_compressor_speeds + 1)
         )
@@ -549,81 +833,70 @@ class AirCooledChiller(Chiller):
         condenser_air_entering_drybulb_temperatures = linspace(
             self.condenser_entering_temperature_range.min,
             self.condenser_entering_temperature_range.max,
-            4,
-        ).tolist()
+            specification.number_of_condenser_entering_temperatures,
+        )
         condenser_air_entering_relative_humidities = [0.4]
         ambient_pressures = [fr_u(1.0, "atm")]
-        grid_variables = {
-            "evaporator_liquid_volumetric_flow_rate": evaporator_liquid_volumetric_flow_rates,
-            "evaporator_liquid_leaving_temperature": evaporator_liquid_leaving_temperatures,
-            "condenser_air_entering_drybulb_temperature": condenser_air_entering_drybulb_temperatures,
-            "condenser_air_entering_relative_humidity": condenser_air_entering_relative_humidities,
-            "ambient_pressure": ambient_pressures,
-            "compressor_sequence_number": compressor_sequence_numbers,
-        }
+        return ConditionGrid(
+            {
+                "evaporator_liquid_volumetric_flow_rate": evaporator_liquid_volumetric_flow_rates,
+                "evaporator_liquid_leaving_temperature": evaporator_liquid_leaving_temperatures,
+                "condenser_air_entering_drybulb_temperature": condenser_air_entering_drybulb_temperatures,
+                "condenser_air_entering_relative_humidity": condenser_air_entering_relative_humidities,
+                "ambient_pressure": ambient_pressures,
+                "compressor_sequence_number": compressor_sequence_numbers,
+            },
+            self.grid_point_conditions,
+        )
+
+    def grid_point_conditions(self, point: dict) -> OperatingConditions:
+        return OperatingConditions(
+            evaporator_outlet=LiquidState(
+                temperature=point["evaporator_liquid_leaving_temperature"],
+                volumetric_flow_rate=point["evaporator_liquid_volumetric_flow_rate"],
+            ),
+            condenser_inlet=PsychrometricState(
+                drybulb=point["condenser_air_entering_drybulb_temperature"],
+                relative_humidity=point["condenser_air_entering_relative_humidity"],
+                pressure=point["ambient_pressure"],
+            ),
+            compressor_speed=self.number_of_compressor_speeds
+            - point["compressor_sequence_number"],
+        )
+
+    @instrumentation.timed
+    def lookup_variables(
+        self, grid: ConditionGrid, start: int = 0, stop: int | None = None
+    ) -> dict[str, NDArray]:
+        performance = self.evaluate_grid(grid, start, stop)
 
-        input_powers = []
-        net_evaporator_capacities = []
-        net_condenser_capacities = []
-        oil_cooler_heats = []
-        auxiliary_heats = []
-        operation_states = []
+        # Condenser air flow and evaporation only depend on compressor speed
         condenser_air_volumetric_flow_rates = []
         evaporation_rates = []
-
-        for v_evap in evaporator_liquid_volumetric_flow_rates:
-            for t_evap in evaporator_liquid_leaving_temperatures:
-                for t_cond in condenser_air_entering_drybulb_temperatures:
-                    for rh_cond in condenser_air_entering_relative_humidities:
-                        for p_cond in ambient_pressures:
-                            for speed in [
-                                self.number_of_compressor_speeds - n
-                                for n in compressor_sequence_numbers
-                            ]:
-                                conditions = OperatingConditions(
-                                    evaporator_outlet=LiquidState(
-                                        temperature=t_evap,
-                                        volumetric_flow_rate=v_evap,
-                                    ),
-                                    condenser_inlet=PsychrometricState(
-                                        drybulb=t_cond,
-                                        relative_humidity=rh_cond,
-                                        pressure=p_cond,
-                                    ),
-                                    compressor_speed=speed,
-                                )
-
-                                input_powers.append(self.input_power(conditions))
-                                net_evaporator_capacities.append(
-                                    self.net_evaporator_capacity(conditions)
-                                )
-                                net_condenser_capacities.append(
-                                    self.net_condenser_capacity(conditions)
-                                )
-                                condenser_air_volumetric_flow_rates.append(
-                                    self.condenser_air_volumetric_flow_rate(conditions)
-                                )
-                                oil_cooler_heats.append(
-                                    self.oil_cooler_heat(conditions)
-                                )
-                                evaporation_rates.append(
-                                    self.evaporation_rate(conditions)
-                                )
-                                auxiliary_heats.append(self.auxiliary_heat(conditions))
-                                operation_states.append("NORMAL")
-
-        lookup_variables = {
-            "input_power": input_powers,
-            "net_evaporator_capacity": net_evaporator_capacities,
-            "net_condenser_capacity": net_condenser_capacities,
-            "condenser_air_volumetric_flow_rate": condenser_air_volumetric_flow_rates,
-            "oil_cooler_heat": oil_cooler_heats,
-            "evaporation_rate": evaporation_rates,
-            "auxiliary_heat": auxiliary_heats,
-            "operation_state": operation_states,
-        }
+        for speed in range(self.number_of_compressor_speeds):
+            rated_conditions_at_speed = OperatingConditions(
+                condenser_inlet=self.rated_operating_conditions.condenser_inlet,
+                evaporator_outlet=self.rated_operating_conditions.evaporator_outlet,
+                compressor_speed=speed,
+            )
+            condenser_air_volumetric_flow_rates.append(
+                self.condenser_air_volumetric_flow_rate(rated_conditions_at_speed)
+            )
+            evaporation_rates.append(self.evaporation_rate(rated_conditions_at_speed))
+        compressor_speeds = (
+            self.number_of_compressor_speeds
+            - grid.columns(start, stop)["compressor_sequence_number"]
+        )
 
         return {
-            "grid_variables": grid_variables,
-            "lookup_variables": lookup_variables,
+            "input_power": performance.input_power,
+            "net_evaporator_capacity": performance.net_evaporator_capacity,
+            "net_condenser_capacity": performance.net_condenser_capacity,
+            "condenser_air_volumetric_flow_rate": asarray(
+                condenser_air_volumetric_flow_rates
+            )[compressor_speeds],
+            "oil_cooler_heat": performance.oil_cooler_heat,
+            "evaporation_rate": asarray(evaporation_rates)[compressor_speeds],
+            "auxiliary_heat": performance.auxiliary_heat,
+            "operation_state": full(len(compressor_speeds), "NORMAL"),
         }
@@ -1,8 +1,17 @@
+from itertools import islice, product
+from math import prod
+from typing import Callable, Iterator, Sequence
+
+from numpy import arange, asarray, unravel_index
+from numpy.typing import NDArray
+
 from koozie import fr_u
 from .fluid_properties import LiquidState, PsychrometricState
 
 
 class OperatingConditions:
+    __slots__ = ("condenser_inlet", "evaporator_outlet", "compressor_speed")
+
     def __init__(
         self,
         condenser_inlet: LiquidState | PsychrometricState,
@@ -14,6 +23,68 @@ class OperatingConditions:
         self.compressor_speed = compressor_speed
 
 
+class ConditionGrid:
+    """Cartesian product of named grid axes that is only expanded on demand.
+
+    Points are ordered with the first axis varying slowest and the last axis varying
+    fastest, which is the order of ASHRAE 205 (e.g., RS0001) lookup variables.
+    'conditions_factory' builds the OperatingConditions for a single point given a
+    dict of axis values.
+    """
+
+    def __init__(
+        self,
+        axes: dict[str, Sequence],
+        conditions_factory: Callable[[dict], OperatingConditions] | None = None,
+    ):
+        self.axes = {name: asarray(values) for name, values in axes.items()}
+        self.conditions_factory = conditions_factory
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(values) for values in self.axes.values())
+
+    @property
+    def size(self) -> int:
+        return prod(self.shape)
+
+    def __len__(self):
+        return self.size
+
+    def grid_variables(self) -> dict[str, list]:
+        return {name: values.tolist() for name, values in self.axes.items()}
+
+    def columns(self, start: int = 0, stop: int | None = None) -> dict[str, NDArray]:
+        """Flattened axis values for points [start, stop)"""
+        if stop is None:
+            stop = self.size
+        indices = unravel_index(arange(start, stop), self.shape)
+        return {
+            name: values[index]
+            for (name, values), index in zip(self.axes.items(), indices)
+        }
+
+    def chunks(self, chunk_size: int) -> Iterator[dict[str, NDArray]]:
+        for start in range(0, self.size, chunk_size):
+            yield self.columns(start, min(start + chunk_size, self.size))
+
+    def points(self, start: int = 0, stop: int | None = None) -> Iterator[dict]:
+        names = list(self.axes)
+        for values in islice(
+            product(*(values.tolist() for values in self.axes.values())), start, stop
+        ):
+            yield dict(zip(names, values))
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.points()
+
+    def conditions(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[OperatingConditions]:
+        for point in self.points(start, stop):
+            yield self.conditions_factory(point)
+
+
 AHRI_550_590_LIQUID_COOLED_CONDITIONS = OperatingConditions(
     condenser_inlet=LiquidState(fr_u(85.0, "°F")),
     evaporator_outlet=LiquidState(fr_u(44.0, "°F")),
@@ -0,0 +1,164 @@
+"""Opt-in counters and timers for hot paths.
+
+    with Instrumentation("my chiller") as instrumentation:
+        chiller.make_performance_map()
+    print(instrumentation.report())
+
+Instrumented code only checks whether any instrumentation is 'active' when none is, so
+the overhead is negligible when disabled. Instrumentation contexts may be nested (e.g.,
+one per generation job within one for a whole run): counts and times are added to every
+active context. Contexts are shared by all threads of a process. Timed methods are also
+reported for each instance (e.g., each chiller, by its metadata description).
+"""
+
+from collections import Counter, defaultdict
+from functools import wraps
+from time import perf_counter
+
+from koozie import to_u
+
+# Innermost active context (None when disabled)
+active: "Instrumentation | None" = None
+
+_stack: list["Instrumentation"] = []
+
+
+class Instrumentation:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.counts: Counter[str] = Counter()
+        self.calls: Counter[str] = Counter()  # Timed method calls
+        self.times: Counter[str] = Counter()  # s
+        # Timed method calls and times of each instance (see 'instance_label')
+        self.instance_calls: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self.instance_times: defaultdict[str, Counter[str]] = defaultdict(Counter)
+
+    def __enter__(self):
+        global active
+        _stack.append(self)
+        active = self
+        return self
+
+    def __exit__(self, *exception_info):
+        global active
+        _stack.remove(self)
+        active = _stack[-1] if _stack else None
+
+    def merge(self, other: "Instrumentation | dict"):
+        """Add counts and times from another context (or its 'to_dict')"""
+        if isinstance(other, dict):
+            other = Instrumentation.from_dict(other)
+        self.counts.update(other.counts)
+        self.calls.update(other.calls)
+        self.times.update(other.times)
+        for label, calls in other.instance_calls.items():
+            self.instance_calls[label].update(calls)
+        for label, times in other.instance_times.items():
+            self.instance_times[label].update(times)
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "counts": dict(self.counts),
+            "calls": dict(self.calls),
+            "times": dict(self.times),
+            "instance_calls": {
+                label: dict(calls) for label, calls in self.instance_calls.items()
+            },
+            "instance_times": {
+                label: dict(times) for label, times in self.instance_times.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "Instrumentation":
+        instrumentation = cls(values["label"])
+        instrumentation.counts.update(values["counts"])
+        instrumentation.calls.update(values["calls"])
+        instrumentation.times.update(values["times"])
+        for label, calls in values.get("instance_calls", {}).items():
+            instrumentation.instance_calls[label].update(calls)
+        for label, times in values.get("instance_times", {}).items():
+            instrumentation.instance_times[label].update(times)
+        return instrumentation
+
+    def report(self) -> str:
+        lines = [f"Instrumentation: {self.label}" if self.label else "Instrumentation"]
+        if self.counts:
+            lines.append(f"  {'Count':<56}{'Number':>12}")
+            for name, number in sorted(self.counts.items()):
+                lines.append(f"  {name:<56}{number:>12}")
+        if self.times:
+            lines.append(f"  {'Method (inclusive time)':<56}{'Calls':>12}{'s':>12}")
+            for name, time in sorted(
+                self.times.items(), key=lambda item: item[1], reverse=True
+            ):
+                lines.append(f"  {name:<56}{self.calls[name]:>12}{time:>12.4f}")
+        if len(self.instance_times) > 1:
+            # Breakdown when several chillers (even of the same class) were timed
+            lines.append(
+                f"  {'Method by instance (inclusive time)':<56}{'Calls':>12}{'s':>12}"
+            )
+            for label, times in sorted(
+                self.instance_times.items(),
+                key=lambda item: sum(item[1].values()),
+                reverse=True,
+            ):
+                lines.append(f"  {label}")
+                calls = self.instance_calls[label]
+                for name, time in sorted(
+                    times.items(), key=lambda item: item[1], reverse=True
+                ):
+                    lines.append(f"    {name:<54}{calls[name]:>12}{time:>12.4f}")
+        return "\n".join(lines)
+
+
+def count(name: str, number: int = 1):
+    """Add to a counter of every active context. Guard calls with 'if active is not None'."""
+    for instrumentation in _stack:
+        instrumentation.counts[name] += number
+
+
+def add_time(name: str, time: float, label: str | None = None):
+    for instrumentation in _stack:
+        instrumentation.calls[name] += 1
+        instrumentation.times[name] += time
+        if label is not None:
+            instrumentation.instance_calls[label][name] += 1
+            instrumentation.instance_times[label][name] += time
+
+
+def instance_label(instance) -> str:
+    """Unique label of an instance: the metadata description of a chiller (or the class
+    name), its rated capacity, and the instance id (chillers of different sizes, or
+    copies of one chiller, may share a description)"""
+    metadata = getattr(instance, "metadata", None)
+    if metadata is not None and metadata.description:
+        label = metadata.description
+    else:
+        label = type(instance).__name__
+    capacity = getattr(instance, "rated_net_evaporator_capacity", None)
+    if isinstance(capacity, (int, float)):
+        label += f" [{to_u(capacity, 'ton_ref'):.1f} ton]"
+    return f"{label} ({id(instance):#x})"
+
+
+def timed(method):
+    """Record wall time and calls of a method (as 'ClassName.method') while active, in
+    total and for each instance"""
+
+    @wraps(method)
+    def timed_method(self, *args, **kwargs):
+        if active is None:
+            return method(self, *args, **kwargs)
+        start_time = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            add_time(
+                f"{type(self).__name__}.{method.__name__}",
+                perf_counter() - start_time,
+                instance_label(self),
+            )
+
+    return timed_method
@@ -0,0 +1,298 @@
+"""Batch generation of ASHRAE 205 representations for the ASHRAE 90.1 baseline chiller library.
+
+Run as a command (e.g., `python -m chiller.library --sizes 10 --formats json cbor`).
+"""
+
+import argparse
+import datetime
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator, NamedTuple
+
+from koozie import fr_u, to_u
+
+from .cache import PerformanceMapCache
+from .instrumentation import Instrumentation
+from .models.ashrae_90_1 import ASHRAE90_1BaselineChiller, ChillerCurveSet
+from .serialization import FILE_FORMATS, write_file
+
+# Upper end of the generated sizes for curve sets without a maximum capacity
+OPEN_ENDED_CAPACITY_SPAN = fr_u(100.0, "ton_ref")
+
+# Version of the library data, incremented when the generated representations change
+DATA_VERSION = 3
+
+
+class LibraryJob(NamedTuple):
+    """One chiller, generated once and written in each of 'file_formats'"""
+
+    set_name: str
+    rated_net_evaporator_capacity: float
+    file_formats: tuple[str, ...]
+    file_path_stem: str  # File path without the format extension
+    cbor_typed_array_dtype: str | None = None  # e.g., "float32"
+    data_timestamp: datetime.datetime | None = None  # Reproducible output if provided
+    data_version: int = DATA_VERSION
+    cache_directory_path: str | None = None  # Performance map cache
+    instrument: bool = False
+
+    def file_path(self, file_format: str) -> str:
+        return f"{self.file_path_stem}.{file_format}"
+
+
+class LibraryJobResult(NamedTuple):
+    job: LibraryJob
+    generation_time: float  # s
+    write_time: float  # s, for all formats
+    written: tuple[bool, ...]  # Per format, False if an identical file already existed
+    cache_hits: int
+    cache_misses: int
+    instrumentation: dict | None = None  # Instrumentation.to_dict() if instrumented
+
+
+def get_curve_set(set_name: str) -> ChillerCurveSet:
+    for curve_set in ASHRAE90_1BaselineChiller.chiller_curve_sets:
+        if curve_set.set_name == set_name:
+            return curve_set
+    raise RuntimeError(f"Unable to find curve-set '{set_name}'")
+
+
+def get_capacities(curve_set: ChillerCurveSet, number_of_sizes: int = 1) -> list[float]:
+    """Capacities at the centers of 'number_of_sizes' equal divisions of the curve set's
+    capacity range (i.e., the middle of the range for a single size)"""
+    minimum_capacity = curve_set.minimum_capacity
+    if curve_set.maximum_capacity == float("inf"):
+        maximum_capacity = minimum_capacity + OPEN_ENDED_CAPACITY_SPAN
+    else:
+        maximum_capacity = curve_set.maximum_capacity
+    span = maximum_capacity - minimum_capacity
+    return [
+        minimum_capacity + span * (size + 0.5) / number_of_sizes
+        for size in range(number_of_sizes)
+    ]
+
+
+def make_jobs(
+    set_names: Iterable[str] | None = None,
+    number_of_sizes: int = 1,
+    file_formats: Iterable[str] = ("json",),
+    output_directory_path: str = "output",
+    cbor_typed_array_dtype: str | None = None,
+    data_timestamp: datetime.datetime | None = None,
+    data_version: int = DATA_VERSION,
+    cache_directory_path: str | None = None,
+    instrument: bool = False,
+) -> list[LibraryJob]:
+    if set_names is None:
+        set_names = [
+            curve_set.set_name for curve_set in ASHRAE90_1BaselineChiller.chiller_curve_sets
+        ]
+    file_formats = tuple(file_formats)
+    for file_format in file_formats:
+        if file_format not in FILE_FORMATS:
+            raise RuntimeError(
+                f"Unsupported file format '{file_format}'. Use one of {FILE_FORMATS}."
+            )
+    jobs = []
+    for set_name in set_names:
+        for capacity in get_capacities(get_curve_set(set_name), number_of_sizes):
+            file_name = f"ASHRAE90-1-2022-AppJ-Curve-Set-{set_name}"
+            if number_of_sizes > 1:
+                file_name += f"-{to_u(capacity, 'ton_ref'):.1f}-ton"
+            jobs.append(
+                LibraryJob(
+                    set_name,
+                    capacity,
+                    file_formats,
+                    os.path.join(output_directory_path, f"{file_name}.RS0001.a205"),
+                    cbor_typed_array_dtype,
+                    data_timestamp,
+                    data_version,
+                    cache_directory_path,
+                    instrument,
+                )
+            )
+    return jobs
+
+
+def run_job(job: LibraryJob) -> LibraryJobResult:
+    if job.instrument:
+        with Instrumentation(job.file_path_stem) as job_instrumentation:
+            result = write_job(job)
+        return result._replace(instrumentation=job_instrumentation.to_dict())
+    return write_job(job)
+
+
+def write_job(job: LibraryJob) -> LibraryJobResult:
+    start_time = time.perf_counter()
+    curve_set = get_curve_set(job.set_name)
+    chiller = ASHRAE90_1BaselineChiller(
+        rated_net_evaporator_capacity=job.rated_net_evaporator_capacity,
+        rated_cop=curve_set.cop,
+        path_type=curve_set.path_type,
+        condenser_type=curve_set.condenser_type,
+        compressor_type=curve_set.compressor_type,
+    )
+    chiller.metadata.data_version = job.data_version
+    chiller.metadata.data_timestamp = job.data_timestamp
+    if job.cache_directory_path is not None:
+        chiller.performance_map_cache = PerformanceMapCache(job.cache_directory_path)
+    representation = chiller.generate_205_representation(spool_lookup_variables=True)
+    write_start_time = time.perf_counter()
+    # Unchanged files are only skipped when the output is reproducible
+    skip_unchanged = job.data_timestamp is not None
+    written = []
+    for file_format in job.file_formats:
+        if file_format == "cbor" and job.cbor_typed_array_dtype is not None:
+            cbor_options = {
+                "typed_arrays": True,
+                "float_dtype": job.cbor_typed_array_dtype,
+            }
+        else:
+            cbor_options = {}
+        written.append(
+            write_file(
+                representation,
+                job.file_path(file_format),
+                file_format,
+                skip_unchanged,
+                **cbor_options,
+            )
+        )
+    end_time = time.perf_counter()
+    cache = chiller.performance_map_cache
+    return LibraryJobResult(
+        job,
+        write_start_time - start_time,
+        end_time - write_start_time,
+        tuple(written),
+        0 if cache is None else cache.hits,
+        0 if cache is None else cache.misses,
+    )
+
+
+def generate_library(
+    jobs: list[LibraryJob], executor: Executor | None = None
+) -> Iterator[LibraryJobResult]:
+    """Run the jobs in order, optionally spread across the workers of an executor"""
+    if executor is None:
+        return map(run_job, jobs)
+    return executor.map(run_job, jobs, chunksize=max(1, len(jobs) // 64))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Generate ASHRAE 205 representations of the ASHRAE 90.1 baseline chillers."
+    )
+    parser.add_argument(
+        "-o", "--output-directory", default="output", help="Directory for the files"
+    )
+    parser.add_argument(
+        "-s",
+        "--sets",
+        nargs="+",
+        metavar="SET_NAME",
+        help="Curve-sets to generate (default: all)",
+    )
+    parser.add_argument(
+        "-n",
+        "--sizes",
+        type=int,
+        default=1,
+        help="Number of capacities generated across each curve-set's capacity range",
+    )
+    parser.add_argument(
+        "-f", "--formats", nargs="+", choices=FILE_FORMATS, default=["json"]
+    )
+    parser.add_argument(
+        "--cbor-typed-arrays",
+        choices=["float64", "float32"],
+        help="Write CBOR lookup variables as RFC 8746 typed arrays of this type",
+    )
+    parser.add_argument(
+        "-t",
+        "--timestamp",
+        type=datetime.datetime.fromisoformat,
+        help="Data timestamp (ISO 8601, e.g., 2024-01-01T00:00) for reproducible output. Unchanged files are not rewritten.",
+    )
+    parser.add_argument(
+        "--data-version",
+        type=int,
+        default=DATA_VERSION,
+        help=f"Data version of the representations (default: {DATA_VERSION})",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        metavar="DIRECTORY",
+        help="Reuse performance maps stored in this directory",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Report property calls, solver iterations, curve evaluations and method times",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (1 runs in this process)",
+    )
+    arguments = parser.parse_args(argv)
+
+    os.makedirs(arguments.output_directory, exist_ok=True)
+    jobs = make_jobs(
+        arguments.sets,
+        arguments.sizes,
+        arguments.formats,
+        arguments.output_directory,
+        arguments.cbor_typed_arrays,
+        arguments.timestamp,
+        arguments.data_version,
+        arguments.cache,
+        arguments.instrument,
+    )
+
+    start_time = time.perf_counter()
+    results = []
+    with (
+        nullcontext()
+        if arguments.jobs == 1
+        else ProcessPoolExecutor(max_workers=arguments.jobs)
+    ) as executor:
+        for result in generate_library(jobs, executor):
+            results.append(result)
+            file_status = ", ".join(
+                f"{file_format} {'written' if written else 'unchanged'}"
+                for file_format, written in zip(result.job.file_formats, result.written)
+            )
+            print(
+                f"{result.job.file_path_stem}: generated in {result.generation_time:.3f} s, {file_status} in {result.write_time:.3f} s"
+            )
+    elapsed_time = time.perf_counter() - start_time
+    busy_time = sum(result.generation_time + result.write_time for result in results)
+    number_of_files = sum(len(result.written) for result in results)
+    number_written = sum(sum(result.written) for result in results)
+    print(
+        f"{number_of_files} files ({number_written} written) from {len(results)} chillers in {elapsed_time:.2f} s ({busy_time:.2f} s of job time)"
+    )
+    if arguments.instrument:
+        # One report per generation job, then the totals
+        total_instrumentation = Instrumentation(f"{len(results)} chillers")
+        for result in results:
+            print(Instrumentation.from_dict(result.instrumentation).report())
+            total_instrumentation.merge(result.instrumentation)
+        print(total_instrumentation.report())
+    if arguments.cache is not None:
+        cache_hits = sum(result.cache_hits for result in results)
+        cache_lookups = cache_hits + sum(result.cache_misses for result in results)
+        print(
+            f"Performance map cache: {cache_hits} of {cache_lookups} maps reused ({cache_hits / max(cache_lookups, 1):.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
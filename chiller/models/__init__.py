@@ -1,3 +1,4 @@
 from .energyplus_eir import *
 from .energyplus_reformulated import *
 from .ashrae_90_1 import *
+from .tabular import *
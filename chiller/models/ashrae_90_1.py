@@ -188,7 +188,9 @@ class ASHRAE90_1BaselineChiller(EnergyPlusEIR):
             )
         )
 
-    def generate_205_representation(self, capacity_range=None):
+    def generate_205_representation(
+        self, capacity_range=None, spool_lookup_variables=False
+    ):
         if capacity_range is None:
             capacity_range = self.capacity_range
         # set metadata
@@ -218,4 +220,6 @@ class ASHRAE90_1BaselineChiller(EnergyPlusEIR):
             f"{unique_characteristics}".encode()
         ).hexdigest()
 
-        return super().generate_205_representation(capacity_range)
+        return super().generate_205_representation(
+            capacity_range, spool_lookup_variables
+        )
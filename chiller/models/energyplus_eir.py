@@ -1,7 +1,8 @@
-from typing import Type
+from typing import NamedTuple, Type
 from copy import deepcopy
 
-from koozie import to_u, fr_u
+from numpy import arange, asarray, broadcast_arrays, clip, maximum, ones, where, zeros
+from numpy.typing import ArrayLike, NDArray
 
 from ..chiller import (
     Chiller,
@@ -12,8 +13,21 @@ from ..chiller import (
     AHRI_550_590_LIQUID_COOLED_CONDITIONS,
     AHRI_550_590_LIQUID_COOLED_CONDENSER_OUTLET,
     OperatingConditions,
+    ChillerPerformance,
 )
+from .. import instrumentation
 from ..util import calc_biquad, calc_cubic
+from ..units import celsius
+
+
+class PartLoadSolution(NamedTuple):
+    """Operating part load ratio for each cooling load (arrays)"""
+
+    part_load_ratio: NDArray
+    minimum_capacity: NDArray  # At the minimum part load ratio
+    available_capacity: NDArray  # At full load
+    converged: NDArray
+    iterations: NDArray
 
 
 class EnergyPlusEIR(Chiller):
@@ -101,31 +115,41 @@ class EnergyPlusEIR(Chiller):
             self.set_rated_condenser_volumetric_flow_rate()
 
     def net_evaporator_capacity(self, conditions=None):
+        if conditions is None:
+            conditions = self.rated_operating_conditions
+        return self.available_capacity(conditions) * self.part_load_ratio(conditions)
+
+    def available_capacity(self, conditions=None):
+        """Full load net evaporator capacity at the conditions"""
         if conditions is None:
             conditions = self.rated_operating_conditions
         coeffs = self.capacity_temperature_coefficients
         capacity_temperature_multiplier = calc_biquad(
             coeffs,
-            to_u(conditions.evaporator_outlet.T, "°C"),
-            to_u(conditions.condenser_inlet.T, "°C"),
-        )
-        return (
-            self.rated_net_evaporator_capacity
-            * capacity_temperature_multiplier
-            * self.part_load_ratio(conditions)
+            celsius.to_u(conditions.evaporator_outlet.T),
+            celsius.to_u(conditions.condenser_inlet.T),
         )
+        return self.rated_net_evaporator_capacity * capacity_temperature_multiplier
 
     def input_power(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        cap = self.net_evaporator_capacity(conditions)
+        return self.input_power_at_capacity(
+            conditions, self.available_capacity(conditions)
+        )
+
+    def input_power_at_capacity(self, conditions, available_capacity):
+        """Input power given the available capacity at the conditions (none at a part
+        load ratio of zero, when the chiller is off)"""
+        plr = self.part_load_ratio(conditions)
+        if plr <= 0.0:
+            return 0.0
         coeffs = self.eir_temperature_coefficients
         eir_temperature_multplier = calc_biquad(
             coeffs,
-            to_u(conditions.evaporator_outlet.T, "°C"),
-            to_u(conditions.condenser_inlet.T, "°C"),
+            celsius.to_u(conditions.evaporator_outlet.T),
+            celsius.to_u(conditions.condenser_inlet.T),
         )
-        plr = self.part_load_ratio(conditions)
         if plr < self.minimum_unloading_ratio:
             effective_plr = self.minimum_unloading_ratio
         else:
@@ -136,36 +160,193 @@ class EnergyPlusEIR(Chiller):
         eir = (
             eir_temperature_multplier * eir_part_load_ratio_multiplier / self.rated_cop
         )
-        return eir * cap / self.part_load_ratio(conditions)
+        return available_capacity * eir
 
     def net_condenser_capacity(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        return (
-            self.input_power(conditions) + self.net_evaporator_capacity(conditions)
-        ) * (1.0 - self.loss_fraction_sum)
+        return self.performance(conditions).net_condenser_capacity
 
     def oil_cooler_heat(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        return (
-            self.input_power(conditions) + self.net_evaporator_capacity(conditions)
-        ) * self.oil_cooler_fraction
+        return self.performance(conditions).oil_cooler_heat
 
     def auxiliary_heat(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        return (
-            self.input_power(conditions) + self.net_evaporator_capacity(conditions)
-        ) * self.auxiliary_fraction
+        return self.performance(conditions).auxiliary_heat
 
-    def part_load_ratio(self, conditions=None):
+    def performance(self, conditions=None) -> ChillerPerformance:
         if conditions is None:
             conditions = self.rated_operating_conditions
+        available_capacity = self.available_capacity(conditions)
+        return self.heat_balance(
+            available_capacity * self.part_load_ratio(conditions),
+            self.input_power_at_capacity(conditions, available_capacity),
+        )
+
+    def heat_balance(self, net_evaporator_capacity, input_power) -> ChillerPerformance:
+        """Split the rejected heat among the condenser, oil cooler, auxiliary and space losses"""
+        total_heat = input_power + net_evaporator_capacity
+        net_condenser_capacity = total_heat * (1.0 - self.loss_fraction_sum)
+        oil_cooler_heat = total_heat * self.oil_cooler_fraction
+        auxiliary_heat = total_heat * self.auxiliary_fraction
+        return ChillerPerformance(
+            net_evaporator_capacity=net_evaporator_capacity,
+            input_power=input_power,
+            net_condenser_capacity=net_condenser_capacity,
+            oil_cooler_heat=oil_cooler_heat,
+            auxiliary_heat=auxiliary_heat,
+            space_loss_heat=total_heat
+            - (net_condenser_capacity + oil_cooler_heat + auxiliary_heat),
+        )
+
+    def performance_characteristics(self) -> tuple:
+        return super().performance_characteristics() + (
+            tuple(self.capacity_temperature_coefficients),
+            tuple(self.eir_temperature_coefficients),
+            tuple(self.eir_part_load_ratio_coefficients),
+            self.minimum_part_load_ratio,
+            self.minimum_unloading_ratio,
+            self.oil_cooler_fraction,
+            self.auxiliary_fraction,
+            self.space_gain_fraction,
+        )
+
+    @instrumentation.timed
+    def evaluate_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+    ) -> ChillerPerformance:
+        """Evaluate every output for arrays of conditions in a single call.
+
+        Inputs are broadcast against each other. Temperatures are in K.
+        """
+        return self.evaluate_part_load_ratio_batch(
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            self.part_load_ratio_batch(compressor_speed),
+        )
+
+    @instrumentation.timed
+    def evaluate_part_load_ratio_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        part_load_ratio: ArrayLike,
+    ) -> ChillerPerformance:
+        """Like 'evaluate_batch', at any part load ratio instead of a compressor speed.
+
+        Below the minimum unloading ratio, capacity is false loaded (e.g., by hot gas
+        bypass) at the power of the minimum unloading ratio. At a part load ratio of
+        zero, the chiller is off (no input power).
+        """
+        evaporator_leaving_temperature = celsius.to_u(
+            asarray(evaporator_leaving_temperature, dtype=float)
+        )
+        condenser_entering_temperature = celsius.to_u(
+            asarray(condenser_entering_temperature, dtype=float)
+        )
+        plr = asarray(part_load_ratio, dtype=float)
+        capacity_temperature_multiplier = calc_biquad(
+            self.capacity_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+        )
+        eir_temperature_multiplier = calc_biquad(
+            self.eir_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+        )
+        eir_part_load_ratio_multiplier = calc_cubic(
+            self.eir_part_load_ratio_coefficients,
+            maximum(plr, self.minimum_unloading_ratio),
+        )
+        available_capacity = (
+            self.rated_net_evaporator_capacity * capacity_temperature_multiplier
+        )
+        eir = (
+            eir_temperature_multiplier * eir_part_load_ratio_multiplier / self.rated_cop
+        )
+        return self.heat_balance(
+            available_capacity * plr, where(plr > 0.0, available_capacity * eir, 0.0)
+        )
+
+    def solve_part_load_ratio(
+        self,
+        cooling_load: ArrayLike,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+    ) -> PartLoadSolution:
+        """Continuous part load ratio that meets each cooling load (W), limited to the
+        range from the minimum part load ratio to full load.
+
+        Capacity is proportional to the part load ratio, so no iterations are needed.
+        Loads in the false loading (e.g., hot gas bypass) region between the minimum
+        part load ratio and the minimum unloading ratio are met at the power of the
+        minimum unloading ratio.
+        """
+        (
+            cooling_load,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+        ) = broadcast_arrays(
+            asarray(cooling_load, dtype=float),
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+        )
+        available_capacity = self.rated_net_evaporator_capacity * calc_biquad(
+            self.capacity_temperature_coefficients,
+            celsius.to_u(evaporator_leaving_temperature),
+            celsius.to_u(condenser_entering_temperature),
+        )
+        part_load_ratio = clip(
+            cooling_load / available_capacity, self.minimum_part_load_ratio, 1.0
+        )
+        return PartLoadSolution(
+            part_load_ratio=part_load_ratio,
+            minimum_capacity=available_capacity * self.minimum_part_load_ratio,
+            available_capacity=available_capacity,
+            converged=ones(part_load_ratio.shape, dtype=bool),
+            iterations=zeros(part_load_ratio.shape, dtype=int),
+        )
+
+    def evaluate_load_batch(
+        self,
+        cooling_load: ArrayLike,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+    ) -> tuple[ChillerPerformance, PartLoadSolution]:
+        """Steady-state performance meeting each cooling load (W) at a continuous part
+        load ratio (see 'solve_part_load_ratio'), and the solution. Loads beyond the
+        available capacity are clamped to full load, and loads below the minimum part
+        load ratio to the minimum part load ratio (see 'simulation.meet_load' for
+        cycling)."""
+        solution = self.solve_part_load_ratio(
+            cooling_load, evaporator_leaving_temperature, condenser_entering_temperature
+        )
+        return (
+            self.evaluate_part_load_ratio_batch(
+                evaporator_leaving_temperature,
+                condenser_entering_temperature,
+                solution.part_load_ratio,
+            ),
+            solution,
+        )
+
+    def minimum_compressor_speed(self):
         if self.minimum_part_load_ratio < self.minimum_unloading_ratio:
-            minimum_speed = self.number_of_compressor_speeds - 2
+            return self.number_of_compressor_speeds - 2
         else:
-            minimum_speed = self.number_of_compressor_speeds - 1
+            return self.number_of_compressor_speeds - 1
+
+    def part_load_ratio(self, conditions=None):
+        if conditions is None:
+            conditions = self.rated_operating_conditions
+        minimum_speed = self.minimum_compressor_speed()
         if conditions.compressor_speed > minimum_speed:
             # Unloading / false loading / hot gas bypass
             return self.minimum_part_load_ratio
@@ -177,6 +358,18 @@ class EnergyPlusEIR(Chiller):
                 / minimum_speed
             )
 
+    def part_load_ratio_batch(self, compressor_speed: ArrayLike):
+        compressor_speed = asarray(compressor_speed)
+        minimum_speed = self.minimum_compressor_speed()
+        return where(
+            compressor_speed > minimum_speed,
+            self.minimum_part_load_ratio,  # Unloading / false loading / hot gas bypass
+            self.minimum_unloading_ratio
+            + (1.0 - self.minimum_unloading_ratio)
+            * (minimum_speed - compressor_speed)
+            / minimum_speed,
+        )
+
     def condenser_air_volumetric_flow_rate(
         self, conditions: OperatingConditions | None = None
     ) -> float:
@@ -198,5 +391,142 @@ class EnergyPlusEIR(Chiller):
         if self.condenser_type == CondenserType.LIQUID:
             LiquidCooledChiller.set_rated_condenser_volumetric_flow_rate(self)
 
-    def make_performance_map(self):
-        return self.chiller_type.make_performance_map(self)
+    def operating_conditions(
+        self,
+        evaporator_leaving_temperature,
+        condenser_entering_temperature,
+        compressor_speed=0,
+    ):
+        return self.chiller_type.operating_conditions(
+            self,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            compressor_speed,
+        )
+
+    def make_condition_grid(self, specification=None):
+        return self.chiller_type.make_condition_grid(self, specification)
+
+    def grid_point_conditions(self, point):
+        return self.chiller_type.grid_point_conditions(self, point)
+
+    @instrumentation.timed
+    def evaluate_grid(self, grid, start=0, stop=None):
+        columns = grid.columns(start, stop)
+        if self.condenser_type == CondenserType.LIQUID:
+            condenser_entering_temperature = columns[
+                "condenser_liquid_entering_temperature"
+            ]
+        else:
+            condenser_entering_temperature = columns[
+                "condenser_air_entering_drybulb_temperature"
+            ]
+        return self.evaluate_batch(
+            columns["evaporator_liquid_leaving_temperature"],
+            condenser_entering_temperature,
+            self.number_of_compressor_speeds - columns["compressor_sequence_number"],
+        )
+
+    def lookup_variables(self, grid, start=0, stop=None):
+        return self.chiller_type.lookup_variables(self, grid, start, stop)
+
+
+class EnergyPlusEIRStack:
+    """Several EnergyPlusEIR chillers evaluated together in single array operations.
+
+    Model parameters are stacked along a chiller axis (shape (number of chillers, 1)),
+    so the EnergyPlusEIR methods below evaluate scalar or 1-D inputs (e.g., timesteps)
+    for every chiller at once, returning arrays with a leading chiller axis (cooling
+    loads may also be given per chiller, with that axis). Only
+    chillers that do not override these methods (e.g., ASHRAE90_1BaselineChiller) can
+    be stacked.
+    """
+
+    STACKED_METHODS = (
+        "evaluate_part_load_ratio_batch",
+        "heat_balance",
+        "solve_part_load_ratio",
+        "evaluate_load_batch",
+    )
+
+    def __init__(self, chillers: list[EnergyPlusEIR]):
+        for chiller in chillers:
+            if not EnergyPlusEIRStack.can_stack(chiller):
+                raise RuntimeError(
+                    f"{type(chiller).__name__} cannot be evaluated in an {EnergyPlusEIRStack.__name__}"
+                )
+        self.chillers = chillers
+
+        def stack(name):
+            return asarray([getattr(chiller, name) for chiller in chillers])[:, None]
+
+        def stack_coefficients(name):
+            # Indexed by coefficient first, as expected by the curve functions
+            return stack(name)[:, 0, :].T[:, :, None]
+
+        self.rated_net_evaporator_capacity = stack("rated_net_evaporator_capacity")
+        self.rated_cop = stack("rated_cop")
+        self.capacity_temperature_coefficients = stack_coefficients(
+            "capacity_temperature_coefficients"
+        )
+        self.eir_temperature_coefficients = stack_coefficients(
+            "eir_temperature_coefficients"
+        )
+        self.eir_part_load_ratio_coefficients = stack_coefficients(
+            "eir_part_load_ratio_coefficients"
+        )
+        self.minimum_part_load_ratio = stack("minimum_part_load_ratio")
+        self.minimum_unloading_ratio = stack("minimum_unloading_ratio")
+        self.oil_cooler_fraction = stack("oil_cooler_fraction")
+        self.auxiliary_fraction = stack("auxiliary_fraction")
+        self.loss_fraction_sum = stack("loss_fraction_sum")
+        self.cycling_degradation_coefficient = stack("cycling_degradation_coefficient")
+        self.standby_power = stack("standby_power")
+        self.number_of_compressor_speeds = max(
+            chiller.number_of_compressor_speeds for chiller in chillers
+        )
+
+    @staticmethod
+    def can_stack(chiller) -> bool:
+        return isinstance(chiller, EnergyPlusEIR) and all(
+            getattr(type(chiller), name) is getattr(EnergyPlusEIR, name)
+            for name in EnergyPlusEIRStack.STACKED_METHODS
+        )
+
+    def __len__(self):
+        return len(self.chillers)
+
+    evaluate_part_load_ratio_batch = EnergyPlusEIR.evaluate_part_load_ratio_batch
+    heat_balance = EnergyPlusEIR.heat_balance
+    solve_part_load_ratio = EnergyPlusEIR.solve_part_load_ratio
+    evaluate_load_batch = EnergyPlusEIR.evaluate_load_batch
+
+    def stage_part_load_ratios(self) -> NDArray:
+        """Part load ratio of each compressor speed, from the lowest capacity to full
+        load, with shape (number of speeds, number of chillers, 1). Chillers with fewer
+        speeds repeat their lowest stage."""
+        part_load_ratios = [
+            chiller.part_load_ratio_batch(
+                arange(chiller.number_of_compressor_speeds - 1, -1, -1)
+            )
+            for chiller in self.chillers
+        ]
+        return asarray(
+            [
+                [values[0]] * (self.number_of_compressor_speeds - len(values))
+                + values.tolist()
+                for values in part_load_ratios
+            ]
+        ).T[:, :, None]
+
+    def evaluate_stages(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+    ) -> ChillerPerformance:
+        """Performance at every stage of 'stage_part_load_ratios' for every chiller"""
+        return self.evaluate_part_load_ratio_batch(
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            self.stage_part_load_ratios(),
+        )
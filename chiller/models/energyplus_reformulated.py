@@ -1,9 +1,40 @@
+from typing import NamedTuple
+
+from numpy import (
+    arange,
+    asarray,
+    broadcast_arrays,
+    flatnonzero,
+    full,
+    isnan,
+    maximum,
+    ones,
+    unique,
+    where,
+    zeros,
+)
+from numpy.typing import ArrayLike, NDArray
+
+from .. import instrumentation
 from ..fluid_properties import LiquidState
-from .energyplus_eir import EnergyPlusEIR
-from ..chiller import CondenserType
-from ..util import calc_biquad, calc_bicubic
-from koozie import to_u
-from scipy import optimize
+from .energyplus_eir import EnergyPlusEIR, PartLoadSolution
+from ..chiller import CondenserType, ChillerPerformance
+from ..util import (
+    LRUCache,
+    calc_biquad,
+    calc_bicubic,
+    calc_biquad_derivative_in_2,
+    calc_bicubic_derivative_in_1,
+    solve_bracketed,
+)
+from ..units import celsius
+from koozie import fr_u
+
+
+class CondenserSolution(NamedTuple):
+    condenser_leaving_temperature: NDArray
+    converged: NDArray
+    iterations: NDArray
 
 
 class EnergyPlusReformulatedEIR(EnergyPlusEIR):
@@ -20,6 +51,7 @@ class EnergyPlusReformulatedEIR(EnergyPlusEIR):
         oil_cooler_fraction=0.0,
         auxiliary_fraction=0.0,
         space_gain_fraction=0.0,
+        solution_cache_size=4096,
     ) -> None:
         super().__init__(
             rated_net_evaporator_capacity,
@@ -34,81 +66,493 @@ class EnergyPlusReformulatedEIR(EnergyPlusEIR):
             auxiliary_fraction,
             space_gain_fraction,
         )
-        self.condenser_leaving_temperature = None
+        # Converged condenser leaving temperatures keyed by operating conditions, for the
+        # performance characteristics they were solved with
+        self.solution_cache = LRUCache(solution_cache_size)
+        self.solution_cache_characteristics = None
 
     def net_evaporator_capacity(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        guess_capacity = self.rated_net_evaporator_capacity * self.part_load_ratio(
-            conditions
+        return self.calculate_evaporator_capacity(
+            conditions, self.solve_condenser_leaving_temperature(conditions)
         )
-        guess_condenser_leaving_temperature = conditions.condenser_inlet.add_heat(
-            guess_capacity
-        ).T
-        self.condenser_leaving_temperature = optimize.newton(
-            lambda x: self.calculate_condenser_capacity(conditions, x)
-            - self.calculate_condenser_heat_added(conditions, x),
-            guess_condenser_leaving_temperature,
+
+    def solve_condenser_leaving_temperature(self, conditions) -> float:
+        # Solutions are stale once coefficients or rated values have been changed
+        characteristics = self.performance_characteristics()
+        if characteristics != self.solution_cache_characteristics:
+            self.solution_cache.clear()
+            self.solution_cache_characteristics = characteristics
+        key = (
+            conditions.evaporator_outlet.T,
+            conditions.condenser_inlet.T,
+            conditions.condenser_inlet.m_dot,
+            conditions.compressor_speed,
         )
-        return self.calculate_evaporator_capacity(
-            conditions, self.condenser_leaving_temperature
+        condenser_leaving_temperature = self.solution_cache.get(key)
+        if condenser_leaving_temperature is not None:
+            return condenser_leaving_temperature
+        solution = self.solve_condenser_leaving_temperature_batch(
+            conditions.evaporator_outlet.T,
+            conditions.condenser_inlet.T,
+            conditions.condenser_inlet.c,
+            conditions.compressor_speed,
+        )
+        if not solution.converged:
+            raise RuntimeError(
+                f"Condenser leaving temperature did not converge after {solution.iterations} iterations"
+            )
+        condenser_leaving_temperature = float(solution.condenser_leaving_temperature)
+        self.solution_cache.put(key, condenser_leaving_temperature)
+        return condenser_leaving_temperature
+
+    @instrumentation.timed
+    def evaluate_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+        condenser_liquid_volumetric_flow_rate: ArrayLike | None = None,
+    ) -> ChillerPerformance:
+        """Evaluate every output for arrays of conditions in a single call.
+
+        The condenser liquid flow rate defaults to the rated flow rate. Points where
+        the condenser solution did not converge are returned as NaN.
+        """
+        return self.evaluate_part_load_ratio_batch(
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            self.part_load_ratio_batch(compressor_speed),
+            condenser_liquid_volumetric_flow_rate,
+        )
+
+    @instrumentation.timed
+    def evaluate_part_load_ratio_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        part_load_ratio: ArrayLike,
+        condenser_liquid_volumetric_flow_rate: ArrayLike | None = None,
+        condenser_inlet_capacity_rate: ArrayLike | None = None,
+    ) -> ChillerPerformance:
+        """Like 'evaluate_batch', at any part load ratio instead of a compressor speed.
+        A precomputed 'condenser_inlet_capacity_rate' may be given instead of the flow
+        rate (see 'condenser_inlet_capacity_rate_batch')."""
+        if condenser_inlet_capacity_rate is None:
+            condenser_inlet_capacity_rate = self.condenser_inlet_capacity_rate_batch(
+                condenser_entering_temperature, condenser_liquid_volumetric_flow_rate
+            )
+        (
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            plr,
+            condenser_inlet_capacity_rate,
+        ) = broadcast_arrays(
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+            asarray(part_load_ratio, dtype=float),
+            asarray(condenser_inlet_capacity_rate, dtype=float),
+        )
+        solution = self.solve_condenser_leaving_temperature_batch(
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            condenser_inlet_capacity_rate,
+            part_load_ratio=plr,
+        )
+        condenser_leaving_temperature = solution.condenser_leaving_temperature.copy()
+        condenser_leaving_temperature[~solution.converged] = float("nan")
+        capacity_temperature_multiplier, _, eir, _ = self.calculate_curves(
+            celsius.to_u(evaporator_leaving_temperature),
+            celsius.to_u(condenser_leaving_temperature),
+            plr,
+        )
+        available_capacity = (
+            self.rated_net_evaporator_capacity * capacity_temperature_multiplier
+        )
+        # The chiller is off at a part load ratio of zero
+        return self.heat_balance(
+            available_capacity * plr, where(plr > 0.0, available_capacity * eir, 0.0)
+        )
+
+    def condenser_inlet_capacity_rate_batch(
+        self,
+        condenser_entering_temperature: ArrayLike,
+        condenser_liquid_volumetric_flow_rate: ArrayLike | None = None,
+    ) -> NDArray:
+        """Condenser liquid inlet capacity rate (mass flow rate times specific heat,
+        W/K). Properties are evaluated once per distinct temperature (before
+        broadcasting against, e.g., compressor speeds)."""
+        if condenser_liquid_volumetric_flow_rate is None:
+            condenser_liquid_volumetric_flow_rate = (
+                self.rated_operating_conditions.condenser_inlet.V_dot
+            )
+        condenser_entering_temperature = asarray(
+            condenser_entering_temperature, dtype=float
+        )
+        pressure = fr_u(1.0, "atm")
+        temperatures, inverse = unique(
+            condenser_entering_temperature, return_inverse=True
+        )
+        return asarray(condenser_liquid_volumetric_flow_rate, dtype=float) * (
+            LiquidState.properties.density(temperatures, pressure)
+            * LiquidState.properties.specific_heat(temperatures, pressure)
+        )[inverse.reshape(condenser_entering_temperature.shape)]
+
+    @instrumentation.timed
+    def solve_part_load_ratio(
+        self,
+        cooling_load: ArrayLike,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        condenser_liquid_volumetric_flow_rate: ArrayLike | None = None,
+        condenser_inlet_capacity_rate: ArrayLike | None = None,
+        tolerance: float = 1e-10,
+    ) -> PartLoadSolution:
+        """Continuous part load ratio that meets each cooling load (W), limited to the
+        range from the minimum part load ratio to full load.
+
+        Capacity depends on the part load ratio through the condenser leaving
+        temperature, so loads between the minimum and full load capacities are solved
+        with 'util.solve_bracketed', each iteration solving the condenser heat balance.
+        Points whose condenser heat balance or part load ratio does not converge are
+        flagged in the returned 'converged' array.
+        """
+        if condenser_inlet_capacity_rate is None:
+            condenser_inlet_capacity_rate = self.condenser_inlet_capacity_rate_batch(
+                condenser_entering_temperature, condenser_liquid_volumetric_flow_rate
+            )
+        (
+            cooling_load,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            condenser_inlet_capacity_rate,
+        ) = broadcast_arrays(
+            asarray(cooling_load, dtype=float),
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+            asarray(condenser_inlet_capacity_rate, dtype=float),
+        )
+        shape = cooling_load.shape
+        cooling_load = cooling_load.ravel()
+        evaporator_leaving_temperature = evaporator_leaving_temperature.ravel()
+        condenser_entering_temperature = condenser_entering_temperature.ravel()
+        condenser_inlet_capacity_rate = condenser_inlet_capacity_rate.ravel()
+
+        def capacity(plr, indices):
+            solution = self.solve_condenser_leaving_temperature_batch(
+                evaporator_leaving_temperature[indices],
+                condenser_entering_temperature[indices],
+                condenser_inlet_capacity_rate[indices],
+                part_load_ratio=plr,
+            )
+            capacity_temperature_multiplier = calc_biquad(
+                self.capacity_temperature_coefficients,
+                celsius.to_u(evaporator_leaving_temperature[indices]),
+                celsius.to_u(solution.condenser_leaving_temperature),
+            )
+            return where(
+                solution.converged,
+                self.rated_net_evaporator_capacity * capacity_temperature_multiplier * plr,
+                float("nan"),
+            )
+
+        indices = arange(cooling_load.size)
+        minimum_capacity = capacity(
+            full(indices.size, self.minimum_part_load_ratio), indices
+        )
+        available_capacity = capacity(ones(indices.size), indices)
+        part_load_ratio = where(
+            cooling_load < available_capacity, self.minimum_part_load_ratio, 1.0
+        )
+        converged = ~(isnan(minimum_capacity) | isnan(available_capacity))
+        iterations = zeros(indices.size, dtype=int)
+
+        solve = flatnonzero(
+            (cooling_load > minimum_capacity) & (cooling_load < available_capacity)
+        )
+        if solve.size > 0:
+            (
+                part_load_ratio[solve],
+                converged[solve],
+                iterations[solve],
+            ) = solve_bracketed(
+                lambda plr, active: capacity(plr, solve[active]),
+                cooling_load[solve],
+                full(solve.size, self.minimum_part_load_ratio),
+                ones(solve.size),
+                minimum_capacity[solve],
+                available_capacity[solve],
+                tolerance,
+            )
+
+        return PartLoadSolution(
+            part_load_ratio=part_load_ratio.reshape(shape),
+            minimum_capacity=minimum_capacity.reshape(shape),
+            available_capacity=available_capacity.reshape(shape),
+            converged=converged.reshape(shape),
+            iterations=iterations.reshape(shape),
+        )
+
+    def evaluate_load_batch(
+        self,
+        cooling_load: ArrayLike,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        condenser_liquid_volumetric_flow_rate: ArrayLike | None = None,
+    ) -> tuple[ChillerPerformance, PartLoadSolution]:
+        condenser_inlet_capacity_rate = self.condenser_inlet_capacity_rate_batch(
+            condenser_entering_temperature, condenser_liquid_volumetric_flow_rate
+        )
+        solution = self.solve_part_load_ratio(
+            cooling_load,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            condenser_inlet_capacity_rate=condenser_inlet_capacity_rate,
+        )
+        return (
+            self.evaluate_part_load_ratio_batch(
+                evaporator_leaving_temperature,
+                condenser_entering_temperature,
+                solution.part_load_ratio,
+                condenser_inlet_capacity_rate=condenser_inlet_capacity_rate,
+            ),
+            solution,
+        )
+
+    @instrumentation.timed
+    def evaluate_grid(self, grid, start=0, stop=None):
+        columns = grid.columns(start, stop)
+        return self.evaluate_batch(
+            columns["evaporator_liquid_leaving_temperature"],
+            columns["condenser_liquid_entering_temperature"],
+            self.number_of_compressor_speeds - columns["compressor_sequence_number"],
+            columns["condenser_liquid_volumetric_flow_rate"],
+        )
+
+    @instrumentation.timed
+    def solve_condenser_leaving_temperature_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        condenser_inlet_capacity_rate: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+        tolerance: float = 1.48e-8,
+        maximum_iterations: int = 50,
+        part_load_ratio: ArrayLike | None = None,
+    ) -> CondenserSolution:
+        """Solve the condenser heat balance for arrays of conditions simultaneously.
+
+        Uses Newton's method with the analytic derivative of the heat balance. The
+        heat added to the condenser liquid is based on the inlet capacity rate
+        (mass flow rate times specific heat), so no fluid properties are evaluated
+        while iterating. Each point stops iterating once its step is smaller than
+        'tolerance' (K); points that do not converge within 'maximum_iterations' are
+        flagged in the returned 'converged' array. A 'part_load_ratio' may be given
+        instead of the compressor speed.
+        """
+        if part_load_ratio is None:
+            part_load_ratio = self.part_load_ratio_batch(compressor_speed)
+        (
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            condenser_inlet_capacity_rate,
+            part_load_ratio,
+        ) = broadcast_arrays(
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+            asarray(condenser_inlet_capacity_rate, dtype=float),
+            asarray(part_load_ratio, dtype=float),
+        )
+        shape = evaporator_leaving_temperature.shape
+        evaporator_leaving_temperature = celsius.to_u(
+            evaporator_leaving_temperature.ravel()
+        )
+        condenser_entering_temperature = condenser_entering_temperature.ravel()
+        condenser_inlet_capacity_rate = condenser_inlet_capacity_rate.ravel()
+        plr = part_load_ratio.ravel()
+
+        # Initial guess: rated capacity at this part load added to the inlet stream
+        condenser_leaving_temperature = (
+            condenser_entering_temperature
+            + self.rated_net_evaporator_capacity * plr / condenser_inlet_capacity_rate
+        )
+
+        size = condenser_leaving_temperature.size
+        converged = zeros(size, dtype=bool)
+        iterations = zeros(size, dtype=int)
+        active = arange(size)
+        for _ in range(maximum_iterations):
+            if active.size == 0:
+                break
+            x = condenser_leaving_temperature[active]
+            (
+                capacity_temperature_multiplier,
+                capacity_temperature_derivative,
+                eir,
+                eir_derivative,
+            ) = self.calculate_curves(
+                evaporator_leaving_temperature[active], celsius.to_u(x), plr[active]
+            )
+            # Condenser heat from the curves: Q_avail * (PLR + EIR), with no input
+            # power when the chiller is off (PLR of zero)
+            eir = where(plr[active] > 0.0, eir, 0.0)
+            eir_derivative = where(plr[active] > 0.0, eir_derivative, 0.0)
+            heat_fraction = plr[active] + eir
+            residual = (
+                self.rated_net_evaporator_capacity
+                * capacity_temperature_multiplier
+                * heat_fraction
+            )
+            residual_derivative = self.rated_net_evaporator_capacity * (
+                capacity_temperature_derivative * heat_fraction
+                + capacity_temperature_multiplier * eir_derivative
+            )
+            # Heat added to the condenser liquid
+            residual -= condenser_inlet_capacity_rate[active] * (
+                x - condenser_entering_temperature[active]
+            )
+            residual_derivative -= condenser_inlet_capacity_rate[active]
+
+            step = residual / residual_derivative
+            condenser_leaving_temperature[active] = x - step
+            iterations[active] += 1
+            done = abs(step) < tolerance
+            converged[active[done]] = True
+            active = active[~done]
+
+        if instrumentation.active is not None:
+            instrumentation.count("newton.solves", size)
+            instrumentation.count("newton.iterations", int(iterations.sum()))
+            instrumentation.count("newton.failures", active.size)
+
+        return CondenserSolution(
+            condenser_leaving_temperature=condenser_leaving_temperature.reshape(shape),
+            converged=converged.reshape(shape),
+            iterations=iterations.reshape(shape),
+        )
+
+    def calculate_curves(
+        self, evaporator_leaving_temperature, condenser_leaving_temperature, plr
+    ):
+        """Capacity multiplier, EIR, and their derivatives with respect to condenser leaving temperature (°C)"""
+        capacity_temperature_multiplier = calc_biquad(
+            self.capacity_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_leaving_temperature,
+        )
+        capacity_temperature_derivative = calc_biquad_derivative_in_2(
+            self.capacity_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_leaving_temperature,
+        )
+        eir_temperature_multiplier = calc_biquad(
+            self.eir_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_leaving_temperature,
+        )
+        eir_temperature_derivative = calc_biquad_derivative_in_2(
+            self.eir_temperature_coefficients,
+            evaporator_leaving_temperature,
+            condenser_leaving_temperature,
+        )
+        effective_plr = maximum(plr, self.minimum_unloading_ratio)
+        eir_part_load_ratio_multiplier = calc_bicubic(
+            self.eir_part_load_ratio_coefficients,
+            condenser_leaving_temperature,
+            effective_plr,
+        )
+        eir_part_load_ratio_derivative = calc_bicubic_derivative_in_1(
+            self.eir_part_load_ratio_coefficients,
+            condenser_leaving_temperature,
+            effective_plr,
+        )
+        eir = (
+            eir_temperature_multiplier * eir_part_load_ratio_multiplier / self.rated_cop
+        )
+        eir_derivative = (
+            eir_temperature_derivative * eir_part_load_ratio_multiplier
+            + eir_temperature_multiplier * eir_part_load_ratio_derivative
+        ) / self.rated_cop
+        return (
+            capacity_temperature_multiplier,
+            capacity_temperature_derivative,
+            eir,
+            eir_derivative,
         )
 
     def input_power(self, conditions=None):
         if conditions is None:
             conditions = self.rated_operating_conditions
-        evaporator_capacity = self.net_evaporator_capacity(conditions)
-        return self.calculate_input_power(
-            conditions, self.condenser_leaving_temperature, evaporator_capacity
+        return self.performance(conditions).input_power
+
+    def performance(self, conditions=None):
+        if conditions is None:
+            conditions = self.rated_operating_conditions
+        condenser_leaving_temperature = self.solve_condenser_leaving_temperature(
+            conditions
+        )
+        available_capacity = self.calculate_available_capacity(
+            conditions, condenser_leaving_temperature
+        )
+        return self.heat_balance(
+            available_capacity * self.part_load_ratio(conditions),
+            self.calculate_input_power(
+                conditions, condenser_leaving_temperature, available_capacity
+            ),
         )
 
     def calculate_evaporator_capacity(self, conditions, condenser_leaving_temperature):
+        return self.calculate_available_capacity(
+            conditions, condenser_leaving_temperature
+        ) * self.part_load_ratio(conditions)
+
+    def calculate_available_capacity(self, conditions, condenser_leaving_temperature):
+        """Full load net evaporator capacity at the conditions"""
         capacity_temperature_multiplier = calc_biquad(
             self.capacity_temperature_coefficients,
-            to_u(conditions.evaporator_outlet.T, "°C"),
-            to_u(condenser_leaving_temperature, "°C"),
-        )
-        return (
-            self.rated_net_evaporator_capacity
-            * capacity_temperature_multiplier
-            * self.part_load_ratio(conditions)
+            celsius.to_u(conditions.evaporator_outlet.T),
+            celsius.to_u(condenser_leaving_temperature),
         )
+        return self.rated_net_evaporator_capacity * capacity_temperature_multiplier
 
     def calculate_condenser_capacity(self, conditions, condenser_leaving_temperature):
-        evaporator_capacity = self.calculate_evaporator_capacity(
+        available_capacity = self.calculate_available_capacity(
             conditions, condenser_leaving_temperature
         )
         power = self.calculate_input_power(
-            conditions, condenser_leaving_temperature, evaporator_capacity
+            conditions, condenser_leaving_temperature, available_capacity
         )
-        return evaporator_capacity + power
+        return available_capacity * self.part_load_ratio(conditions) + power
 
     def calculate_condenser_heat_added(self, conditions, condenser_leaving_temperature):
-        condenser_leaving_state = LiquidState(
-            temperature=condenser_leaving_temperature,
-            mass_flow_rate=conditions.condenser_inlet.m_dot,
+        return conditions.condenser_inlet.c * (
+            condenser_leaving_temperature - conditions.condenser_inlet.T
         )
-        return condenser_leaving_state.get_heat(conditions.condenser_inlet)
 
     def calculate_input_power(
-        self, conditions, condenser_leaving_temperature, evaporator_capacity
+        self, conditions, condenser_leaving_temperature, available_capacity
     ):
+        """Input power given the available capacity at the conditions (none at a part
+        load ratio of zero, when the chiller is off)"""
+        plr = self.part_load_ratio(conditions)
+        if plr <= 0.0:
+            return 0.0
         eir_temperature_multiplier = calc_biquad(
             self.eir_temperature_coefficients,
-            to_u(conditions.evaporator_outlet.T, "°C"),
-            to_u(condenser_leaving_temperature, "°C"),
+            celsius.to_u(conditions.evaporator_outlet.T),
+            celsius.to_u(condenser_leaving_temperature),
         )
-        plr = self.part_load_ratio(conditions)
         if plr < self.minimum_unloading_ratio:
             effective_plr = self.minimum_unloading_ratio
         else:
             effective_plr = plr
         eir_part_load_ratio_multiplier = calc_bicubic(
             self.eir_part_load_ratio_coefficients,
-            to_u(condenser_leaving_temperature, "°C"),
+            celsius.to_u(condenser_leaving_temperature),
             effective_plr,
         )
         eir = (
             eir_temperature_multiplier * eir_part_load_ratio_multiplier / self.rated_cop
         )
-        return eir * evaporator_capacity / self.part_load_ratio(conditions)
+        return available_capacity * eir
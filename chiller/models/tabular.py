@@ -0,0 +1,493 @@
+from copy import deepcopy
+from hashlib import sha256
+from itertools import product
+from math import prod
+from typing import Type
+
+from numpy import (
+    asarray,
+    ascontiguousarray,
+    broadcast_arrays,
+    clip,
+    searchsorted,
+    stack,
+    zeros,
+)
+from numpy.typing import ArrayLike, NDArray
+from scipy.interpolate import RegularGridInterpolator
+
+from koozie import fr_u
+
+from .. import instrumentation
+from ..chiller import (
+    Chiller,
+    ChillerPerformance,
+    CondenserType,
+    CompressorType,
+    FloatRange,
+    LiquidCooledChiller,
+    AirCooledChiller,
+)
+from ..conditions import (
+    AHRI_550_590_AIR_COOLED_CONDITIONS,
+    AHRI_550_590_LIQUID_COOLED_CONDITIONS,
+    AHRI_550_590_LIQUID_COOLED_CONDENSER_OUTLET,
+    OperatingConditions,
+)
+from ..performance_map import PerformanceMap
+from ..serialization import read_file
+
+# Interpolated lookup variables of the cooling performance map (in ChillerPerformance
+# order; space loss heat is the remainder of the heat balance)
+TABULAR_LOOKUP_VARIABLES = (
+    "net_evaporator_capacity",
+    "input_power",
+    "net_condenser_capacity",
+    "oil_cooler_heat",
+    "auxiliary_heat",
+)
+
+# Iterations between the rated capacities and the rated flow rates derived from them
+# (only needed when the map varies with flow rate)
+TABULAR_RATING_ITERATIONS = 10
+
+
+class MultilinearInterpolator:
+    """Multilinear interpolation (and linear extrapolation) of several values on a
+    regular grid, equivalent to scipy's RegularGridInterpolator with method="linear"
+    and fill_value=None.
+
+    Values are held as one (values, grid points) table, so each corner of the
+    enclosing cells is gathered for every value at once. Axes where every point is on
+    a grid value (e.g., compressor sequence numbers) only gather lower corners.
+    """
+
+    def __init__(self, axes: tuple[NDArray, ...], values: NDArray):
+        self.axes = axes
+        shape = tuple(len(axis) for axis in axes)
+        self.values = ascontiguousarray(values.reshape(prod(shape), -1).T)
+        self.strides = [prod(shape[axis + 1 :]) for axis in range(len(shape))]
+
+    def __call__(self, points: NDArray) -> NDArray:
+        """Values at points of shape (number of points, number of axes)"""
+        lower_index = zeros(len(points), dtype=int)
+        weights = []
+        for axis, (grid, stride) in enumerate(zip(self.axes, self.strides)):
+            x = points[:, axis]
+            # Cells at the edges are extended for extrapolation
+            index = clip(searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+            lower = grid[index]
+            fraction = (x - lower) / (grid[index + 1] - lower)
+            lower_index += index * stride
+            if fraction.any():
+                weights.append(((1.0 - fraction, 0), (fraction, stride)))
+            else:
+                weights.append(((1.0, 0),))
+
+        result = zeros((self.values.shape[0], len(points)))
+        for corner in product(*weights):
+            weight = 1.0
+            offset = 0
+            for axis_weight, axis_offset in corner:
+                weight = weight * axis_weight
+                offset += axis_offset
+            result += weight * self.values.take(lower_index + offset, axis=1)
+        return result.T
+
+
+class TabularChiller(Chiller):
+    """Chiller evaluated by interpolating an RS0001 cooling performance map.
+
+    The lookup variables are stacked into one array, so a single regular grid
+    interpolation (multilinear by default, or another scipy RegularGridInterpolator
+    'method', e.g., "cubic") evaluates every output at once. Grid variables with a
+    single value are dropped. Compressor sequence numbers 1 to N correspond to
+    compressor speeds N - 1 to 0. Points outside the grid are extrapolated.
+
+    Rated values are interpolated at the AHRI 550/590 conditions and full load.
+    """
+
+    def __init__(
+        self,
+        performance_map_cooling: dict | PerformanceMap,
+        condenser_type: CondenserType = CondenserType.LIQUID,
+        cycling_degradation_coefficient=0.0,
+        standby_power=0.0,
+        compressor_type=CompressorType.UNKNOWN,
+        method: str = "linear",
+    ) -> None:
+        if isinstance(performance_map_cooling, dict):
+            missing = [
+                name
+                for name in TABULAR_LOOKUP_VARIABLES
+                if name not in performance_map_cooling["lookup_variables"]
+            ]
+            if len(missing) > 0:
+                raise RuntimeError(
+                    f"Cooling performance map is missing lookup variables: {missing}"
+                )
+            performance_map_cooling = PerformanceMap(
+                performance_map_cooling["grid_variables"],
+                {
+                    name: performance_map_cooling["lookup_variables"][name]
+                    for name in TABULAR_LOOKUP_VARIABLES
+                },
+            )
+        self.performance_map = performance_map_cooling
+        self.method = method
+
+        grid_variables = self.performance_map.grid_variables
+        self.interpolation_variables = [
+            name for name, values in grid_variables.items() if len(values) > 1
+        ]
+        axes = tuple(
+            asarray(grid_variables[name], dtype=float)
+            for name in self.interpolation_variables
+        )
+        values = stack(
+            [self.performance_map[name] for name in TABULAR_LOOKUP_VARIABLES], axis=-1
+        ).reshape(tuple(len(axis) for axis in axes) + (-1,))
+        if method == "linear":
+            self.interpolator = MultilinearInterpolator(axes, values)
+        else:
+            self.interpolator = RegularGridInterpolator(
+                axes, values, method=method, bounds_error=False, fill_value=None
+            )
+        self.performance_map_hash = sha256(
+            b"".join(
+                asarray(values, dtype=float).tobytes()
+                for values in list(grid_variables.values())
+                + [self.performance_map[name] for name in TABULAR_LOOKUP_VARIABLES]
+            )
+        ).hexdigest()
+
+        evaporator_leaving_temperatures = grid_variables[
+            "evaporator_liquid_leaving_temperature"
+        ]
+        self.chiller_type: Type[Chiller]
+        if condenser_type == CondenserType.LIQUID:
+            self.chiller_type = LiquidCooledChiller
+            self.rated_operating_conditions = deepcopy(
+                AHRI_550_590_LIQUID_COOLED_CONDITIONS
+            )
+            condenser_entering_temperatures = grid_variables[
+                "condenser_liquid_entering_temperature"
+            ]
+        elif condenser_type == CondenserType.AIR:
+            self.chiller_type = AirCooledChiller
+            self.rated_operating_conditions = deepcopy(
+                AHRI_550_590_AIR_COOLED_CONDITIONS
+            )
+            condenser_entering_temperatures = grid_variables[
+                "condenser_air_entering_drybulb_temperature"
+            ]
+        else:
+            raise RuntimeError(
+                f"{type(self).__name__} is not implemented for {condenser_type.name} condensers"
+            )
+
+        # Flow rates within the map until the rated flow rates are known
+        self.rated_operating_conditions.evaporator_outlet.V_dot = float(
+            grid_variables["evaporator_liquid_volumetric_flow_rate"][-1]
+        )
+        if condenser_type == CondenserType.LIQUID:
+            self.rated_operating_conditions.condenser_inlet.V_dot = float(
+                grid_variables["condenser_liquid_volumetric_flow_rate"][-1]
+            )
+        self.condenser_type = condenser_type
+        self.number_of_compressor_speeds = len(
+            grid_variables["compressor_sequence_number"]
+        )
+        rated_performance = self.performance(self.rated_operating_conditions)
+
+        super().__init__(
+            rated_net_evaporator_capacity=rated_performance.net_evaporator_capacity,
+            rated_cop=rated_performance.net_evaporator_capacity
+            / rated_performance.input_power,
+            cycling_degradation_coefficient=cycling_degradation_coefficient,
+            standby_power=standby_power,
+            rated_net_condenser_capacity=rated_performance.net_condenser_capacity,
+            number_of_compressor_speeds=self.number_of_compressor_speeds,
+            evaporator_leaving_temperature_range=FloatRange(
+                float(evaporator_leaving_temperatures[0]),
+                float(evaporator_leaving_temperatures[-1]),
+            ),
+            condenser_entering_temperature_range=FloatRange(
+                float(condenser_entering_temperatures[0]),
+                float(condenser_entering_temperatures[-1]),
+            ),
+            condenser_type=condenser_type,
+            compressor_type=compressor_type,
+        )
+
+        if condenser_type == CondenserType.LIQUID:
+            self.rated_condenser_outlet_state = deepcopy(
+                AHRI_550_590_LIQUID_COOLED_CONDENSER_OUTLET
+            )
+            self.set_rated_condenser_volumetric_flow_rate()
+
+        # The rated flow rates follow from the rated capacities, which depend on the
+        # flow rates when the map does
+        if any(
+            name
+            in (
+                "evaporator_liquid_volumetric_flow_rate",
+                "condenser_liquid_volumetric_flow_rate",
+            )
+            for name in self.interpolation_variables
+        ):
+            for _ in range(TABULAR_RATING_ITERATIONS):
+                rated_performance = self.performance(self.rated_operating_conditions)
+                if (
+                    abs(
+                        rated_performance.net_evaporator_capacity
+                        - self.rated_net_evaporator_capacity
+                    )
+                    < 1e-9 * self.rated_net_evaporator_capacity
+                ):
+                    break
+                self.rated_net_evaporator_capacity = (
+                    rated_performance.net_evaporator_capacity
+                )
+                self.rated_cop = (
+                    rated_performance.net_evaporator_capacity
+                    / rated_performance.input_power
+                )
+                self.rated_net_condenser_capacity = (
+                    rated_performance.net_condenser_capacity
+                )
+                self.set_rated_evaporator_volumetric_flow_rate()
+                self.set_rated_condenser_volumetric_flow_rate()
+
+    @classmethod
+    def from_representation(
+        cls, representation: dict, method: str = "linear"
+    ) -> "TabularChiller":
+        """Chiller from an RS0001 representation (e.g., from 'serialization.read_file')"""
+        performance = representation["performance"]
+        product_information = representation.get("description", {}).get(
+            "product_information", {}
+        )
+        compressor_type = product_information.get("compressor_type")
+        standby_power = 0.0
+        if "performance_map_standby" in performance:
+            standby_power = performance["performance_map_standby"]["lookup_variables"][
+                "input_power"
+            ][0]
+        chiller = cls(
+            performance["performance_map_cooling"],
+            condenser_type=CondenserType[performance["condenser_type"]],
+            cycling_degradation_coefficient=performance.get(
+                "cycling_degradation_coefficient", 0.0
+            ),
+            standby_power=standby_power,
+            compressor_type=(
+                CompressorType[compressor_type]
+                if compressor_type in CompressorType.__members__
+                else CompressorType.UNKNOWN
+            ),
+            method=method,
+        )
+        chiller.metadata.description = representation.get("metadata", {}).get(
+            "description", ""
+        )
+        chiller.metadata.has_hot_gas_bypass_installed = product_information.get(
+            "hot_gas_bypass_installed", False
+        )
+        return chiller
+
+    @classmethod
+    def from_file(cls, file_path: str, method: str = "linear") -> "TabularChiller":
+        return cls.from_representation(read_file(file_path), method)
+
+    @instrumentation.timed
+    def interpolate(self, grid_values: dict[str, ArrayLike]) -> ChillerPerformance:
+        """Every output at arrays of grid variable values (by RS0001 name), which are
+        broadcast against each other. Values of dropped grid variables are ignored."""
+        missing = [
+            name for name in self.interpolation_variables if name not in grid_values
+        ]
+        if len(missing) > 0:
+            raise RuntimeError(f"Values are required for grid variables: {missing}")
+        points = broadcast_arrays(
+            *(
+                asarray(grid_values[name], dtype=float)
+                for name in self.interpolation_variables
+            )
+        )
+        if instrumentation.active is not None:
+            instrumentation.count("tabular.points", points[0].size)
+        values = self.interpolator(
+            stack([values.ravel() for values in points], axis=-1)
+        )
+        (
+            net_evaporator_capacity,
+            input_power,
+            net_condenser_capacity,
+            oil_cooler_heat,
+            auxiliary_heat,
+        ) = (
+            values[:, index].reshape(points[0].shape)
+            for index in range(len(TABULAR_LOOKUP_VARIABLES))
+        )
+        return ChillerPerformance(
+            net_evaporator_capacity=net_evaporator_capacity,
+            input_power=input_power,
+            net_condenser_capacity=net_condenser_capacity,
+            oil_cooler_heat=oil_cooler_heat,
+            auxiliary_heat=auxiliary_heat,
+            space_loss_heat=(input_power + net_evaporator_capacity)
+            - (net_condenser_capacity + oil_cooler_heat + auxiliary_heat),
+        )
+
+    def grid_values(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+    ) -> dict[str, ArrayLike]:
+        """Grid variable values at the given temperatures (K) and the rated flow rates"""
+        grid_values = {
+            "evaporator_liquid_volumetric_flow_rate": self.rated_operating_conditions.evaporator_outlet.V_dot,
+            "evaporator_liquid_leaving_temperature": evaporator_leaving_temperature,
+            "compressor_sequence_number": self.number_of_compressor_speeds
+            - asarray(compressor_speed),
+        }
+        if self.condenser_type == CondenserType.LIQUID:
+            grid_values.update(
+                {
+                    "condenser_liquid_volumetric_flow_rate": self.rated_operating_conditions.condenser_inlet.V_dot,
+                    "condenser_liquid_entering_temperature": condenser_entering_temperature,
+                }
+            )
+        else:
+            grid_values.update(
+                {
+                    "condenser_air_entering_drybulb_temperature": condenser_entering_temperature,
+                    "condenser_air_entering_relative_humidity": 0.4,
+                    "ambient_pressure": fr_u(1.0, "atm"),
+                }
+            )
+        return grid_values
+
+    def net_evaporator_capacity(self, conditions=None):
+        return self.performance(conditions).net_evaporator_capacity
+
+    def input_power(self, conditions=None):
+        return self.performance(conditions).input_power
+
+    def net_condenser_capacity(self, conditions=None):
+        return self.performance(conditions).net_condenser_capacity
+
+    def oil_cooler_heat(self, conditions=None):
+        return self.performance(conditions).oil_cooler_heat
+
+    def auxiliary_heat(self, conditions=None):
+        return self.performance(conditions).auxiliary_heat
+
+    def performance(self, conditions=None) -> ChillerPerformance:
+        if conditions is None:
+            conditions = self.rated_operating_conditions
+        # Flow rates and air properties are only read when they are interpolated
+        interpolated = self.interpolation_variables
+        grid_values = {
+            "evaporator_liquid_leaving_temperature": conditions.evaporator_outlet.T,
+            "compressor_sequence_number": self.number_of_compressor_speeds
+            - conditions.compressor_speed,
+        }
+        if "evaporator_liquid_volumetric_flow_rate" in interpolated:
+            grid_values["evaporator_liquid_volumetric_flow_rate"] = (
+                conditions.evaporator_outlet.V_dot
+            )
+        if self.condenser_type == CondenserType.LIQUID:
+            grid_values["condenser_liquid_entering_temperature"] = (
+                conditions.condenser_inlet.T
+            )
+            if "condenser_liquid_volumetric_flow_rate" in interpolated:
+                grid_values["condenser_liquid_volumetric_flow_rate"] = (
+                    conditions.condenser_inlet.V_dot
+                )
+        else:
+            grid_values["condenser_air_entering_drybulb_temperature"] = (
+                conditions.condenser_inlet.T
+            )
+            if "condenser_air_entering_relative_humidity" in interpolated:
+                grid_values["condenser_air_entering_relative_humidity"] = (
+                    conditions.condenser_inlet.rh
+                )
+            if "ambient_pressure" in interpolated:
+                grid_values["ambient_pressure"] = conditions.condenser_inlet.p
+        return ChillerPerformance(
+            *(float(values) for values in self.interpolate(grid_values))
+        )
+
+    def performance_characteristics(self) -> tuple:
+        return super().performance_characteristics() + (
+            self.method,
+            self.performance_map_hash,
+        )
+
+    def evaluate_batch(
+        self,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        compressor_speed: ArrayLike = 0,
+    ) -> ChillerPerformance:
+        """Evaluate every output for arrays of conditions in a single call.
+
+        Inputs are broadcast against each other. Temperatures are in K.
+        """
+        return self.interpolate(
+            self.grid_values(
+                evaporator_leaving_temperature,
+                condenser_entering_temperature,
+                compressor_speed,
+            )
+        )
+
+    @instrumentation.timed
+    def evaluate_grid(self, grid, start=0, stop=None):
+        return self.interpolate(grid.columns(start, stop))
+
+    def condenser_air_volumetric_flow_rate(
+        self, conditions: OperatingConditions | None = None
+    ) -> float:
+        if self.condenser_type != CondenserType.LIQUID:
+            return AirCooledChiller.condenser_air_volumetric_flow_rate(self, conditions)
+        else:
+            raise RuntimeError(f"Function not provided for this type of condenser.")
+
+    def evaporation_rate(self, conditions: OperatingConditions | None = None) -> float:
+        if self.condenser_type != CondenserType.LIQUID:
+            return AirCooledChiller.evaporation_rate(self, conditions)
+        else:
+            raise RuntimeError(f"Function not provided for this type of condenser.")
+
+    def set_rated_evaporator_volumetric_flow_rate(self):
+        self.chiller_type.set_rated_evaporator_volumetric_flow_rate(self)
+
+    def set_rated_condenser_volumetric_flow_rate(self):
+        if self.condenser_type == CondenserType.LIQUID:
+            LiquidCooledChiller.set_rated_condenser_volumetric_flow_rate(self)
+
+    def operating_conditions(
+        self,
+        evaporator_leaving_temperature,
+        condenser_entering_temperature,
+        compressor_speed=0,
+    ):
+        return self.chiller_type.operating_conditions(
+            self,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+            compressor_speed,
+        )
+
+    def make_condition_grid(self, specification=None):
+        return self.chiller_type.make_condition_grid(self, specification)
+
+    def grid_point_conditions(self, point):
+        return self.chiller_type.grid_point_conditions(self, point)
+
+    def lookup_variables(self, grid, start=0, stop=None):
+        return self.chiller_type.lookup_variables(self, grid, start, stop)
@@ -0,0 +1,92 @@
+from math import prod
+from typing import Iterable
+
+from numpy import ascontiguousarray, asarray, empty, float64, issubdtype, floating
+from numpy.typing import ArrayLike, DTypeLike, NDArray
+
+from .conditions import ConditionGrid
+
+
+class PerformanceMap:
+    """Grid and lookup variables of an ASHRAE 205 performance map held in NumPy arrays.
+
+    Each lookup variable is a contiguous array shaped to the grid (one dimension per
+    grid variable, first variable slowest). Floating point lookup variables are stored
+    with 'dtype' (e.g., float32 to halve memory); grid variables keep their precision.
+    Values are only converted to lists by 'to_dict' (i.e., for serialization).
+    """
+
+    def __init__(
+        self,
+        grid_variables: dict[str, ArrayLike],
+        lookup_variables: dict[str, ArrayLike],
+        dtype: DTypeLike = float64,
+    ):
+        self.dtype = dtype
+        self.grid_variables = {
+            name: ascontiguousarray(values) for name, values in grid_variables.items()
+        }
+        self.lookup_variables = {}
+        for name, values in lookup_variables.items():
+            values = asarray(values)
+            if issubdtype(values.dtype, floating):
+                values = values.astype(dtype, copy=False)
+            self.lookup_variables[name] = ascontiguousarray(values).reshape(self.shape)
+
+    @classmethod
+    def from_chunks(
+        cls,
+        grid: ConditionGrid,
+        chunks: Iterable[dict[str, NDArray]],
+        dtype: DTypeLike = float64,
+    ) -> "PerformanceMap":
+        """Assemble a map from consecutive blocks of lookup variables (in grid order)"""
+        lookup_variables: dict[str, NDArray] = {}
+        start = 0
+        for chunk in chunks:
+            stop = start
+            for name, values in chunk.items():
+                if name not in lookup_variables:
+                    lookup_variables[name] = empty(
+                        grid.size,
+                        dtype=dtype if issubdtype(values.dtype, floating) else values.dtype,
+                    )
+                stop = start + len(values)
+                lookup_variables[name][start:stop] = values
+            start = stop
+        if start != grid.size:
+            raise RuntimeError(
+                f"Chunks provided {start} of the {grid.size} points in the grid."
+            )
+        return cls(grid.axes, lookup_variables, dtype)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(values) for values in self.grid_variables.values())
+
+    @property
+    def size(self) -> int:
+        return prod(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.lookup_variables.values())
+
+    def __getitem__(self, name: str) -> NDArray:
+        return self.lookup_variables[name]
+
+    def to_dict(self, lookup_variables_as_lists: bool = True) -> dict:
+        """RS0001 layout. Lookup variables may be left as flattened arrays (views)."""
+        return {
+            "grid_variables": {
+                name: values.tolist() for name, values in self.grid_variables.items()
+            },
+            "lookup_variables": {
+                name: (
+                    values.ravel().tolist()
+                    if lookup_variables_as_lists
+                    else values.ravel()
+                )
+                for name, values in self.lookup_variables.items()
+            },
+        }
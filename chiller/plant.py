@@ -0,0 +1,284 @@
+from typing import Callable, NamedTuple
+
+from numpy import (
+    asarray,
+    atleast_1d,
+    broadcast_arrays,
+    concatenate,
+    cumsum,
+    empty,
+    maximum,
+    minimum,
+    where,
+)
+from numpy.typing import ArrayLike, NDArray
+
+from koozie import fr_u
+
+from .chiller import Chiller
+from .models.energyplus_eir import EnergyPlusEIR, EnergyPlusEIRStack
+from .simulation import (
+    PartLoadPerformance,
+    SimulationTotals,
+    evaluate_chiller_stages,
+    integrate,
+    meet_load_with_stages,
+    part_load_performance,
+)
+
+PLANT_CHUNK_SIZE = 2048  # Timesteps
+
+# Staging rules: (cooling_load (timesteps), available_capacity (chillers, timesteps))
+# -> whether each chiller is on (chillers, timesteps)
+StagingRule = Callable[[NDArray, NDArray], NDArray]
+
+# Load split rules: (cooling_load, available_capacity, on) -> load of each chiller
+LoadSplitRule = Callable[[NDArray, NDArray, NDArray], NDArray]
+
+
+def sequential_staging(
+    cooling_load: NDArray,
+    available_capacity: NDArray,
+    maximum_part_load_ratio: float = 1.0,
+) -> NDArray:
+    """Chillers are started in order until the capacity of those on, derated by
+    'maximum_part_load_ratio', covers the load (all are on if it cannot be met).
+    Use functools.partial to set 'maximum_part_load_ratio'."""
+    capacity_before = cumsum(available_capacity, axis=0) - available_capacity
+    return (capacity_before < cooling_load / maximum_part_load_ratio) & (
+        cooling_load > 0.0
+    )
+
+
+def equal_part_load_ratio_split(
+    cooling_load: NDArray, available_capacity: NDArray, on: NDArray
+) -> NDArray:
+    """Chillers that are on share the load in proportion to their available capacity"""
+    capacity_on = where(on, available_capacity, 0.0)
+    total_capacity_on = capacity_on.sum(axis=0)
+    return capacity_on * minimum(
+        cooling_load / where(total_capacity_on > 0.0, total_capacity_on, 1.0), 1.0
+    )
+
+
+def sequential_split(
+    cooling_load: NDArray, available_capacity: NDArray, on: NDArray
+) -> NDArray:
+    """Chillers that are on are loaded fully in order, the last one taking the rest"""
+    capacity_on = where(on, available_capacity, 0.0)
+    capacity_before = cumsum(capacity_on, axis=0) - capacity_on
+    return minimum(maximum(cooling_load - capacity_before, 0.0), capacity_on)
+
+
+class PlantSimulationResults(NamedTuple):
+    timestep: float  # s
+    on: NDArray  # (chillers, timesteps)
+    performance: PartLoadPerformance  # Of each chiller: (chillers, timesteps)
+    chiller_totals: SimulationTotals  # Arrays with one value per chiller
+    totals: SimulationTotals  # Plant (unmet load is relative to the plant load)
+
+
+class Plant:
+    """Chillers sharing one cooling load, with pluggable staging and load split rules.
+
+    Each block of timesteps is simulated in two passes: the available capacity of
+    every chiller, which the staging and load split rules use, and then the
+    performance at each chiller's share of the load. The rules operate on (chillers,
+    timesteps) arrays, independently for each timestep. Chillers meet their loads as
+    in 'simulation.meet_load': chillers that can be stacked are evaluated together as
+    one EnergyPlusEIRStack, other EnergyPlusEIR chillers one at a time, and the rest by
+    interpolating between their compressor speeds (see
+    'simulation.evaluate_chiller_stages').
+    """
+
+    def __init__(
+        self,
+        chillers: list[Chiller],
+        staging: StagingRule = sequential_staging,
+        load_split: LoadSplitRule = equal_part_load_ratio_split,
+    ):
+        if len(chillers) == 0:
+            raise RuntimeError("A plant requires at least one chiller")
+        self.chillers = chillers
+        self.staging = staging
+        self.load_split = load_split
+
+        self.stacked_indices = [
+            index
+            for index, chiller in enumerate(chillers)
+            if EnergyPlusEIRStack.can_stack(chiller)
+        ]
+        self.stack = (
+            EnergyPlusEIRStack([chillers[index] for index in self.stacked_indices])
+            if len(self.stacked_indices) > 0
+            else None
+        )
+        self.solved_indices = [
+            index
+            for index, chiller in enumerate(chillers)
+            if isinstance(chiller, EnergyPlusEIR) and index not in self.stacked_indices
+        ]
+        self.staged_indices = [
+            index
+            for index, chiller in enumerate(chillers)
+            if not isinstance(chiller, EnergyPlusEIR)
+        ]
+
+    def simulate(
+        self,
+        cooling_load: ArrayLike,
+        evaporator_leaving_temperature: ArrayLike,
+        condenser_entering_temperature: ArrayLike,
+        timestep: float = fr_u(1.0, "hr"),
+        chunk_size: int = PLANT_CHUNK_SIZE,
+    ) -> PlantSimulationResults:
+        """Simulate the plant over a series of timesteps.
+
+        Inputs are 1-D arrays (or scalars) of the plant cooling load (W), chilled
+        water supply temperature (K) and condenser entering temperature (K), shared by
+        all chillers. Timesteps are evaluated in blocks of 'chunk_size', which keeps
+        the (chillers, timesteps) arrays small enough to stay in cache.
+        """
+        (
+            cooling_load,
+            evaporator_leaving_temperature,
+            condenser_entering_temperature,
+        ) = broadcast_arrays(
+            maximum(atleast_1d(asarray(cooling_load, dtype=float)), 0.0),
+            asarray(evaporator_leaving_temperature, dtype=float),
+            asarray(condenser_entering_temperature, dtype=float),
+        )
+
+        on_chunks = []
+        performance_chunks = []
+        for start in range(0, cooling_load.size, chunk_size):
+            stop = start + chunk_size
+            on, performance = self.simulate_block(
+                cooling_load[start:stop],
+                evaporator_leaving_temperature[start:stop],
+                condenser_entering_temperature[start:stop],
+            )
+            on_chunks.append(on)
+            performance_chunks.append(performance)
+        on = concatenate(on_chunks, axis=1)
+        performance = PartLoadPerformance(
+            *(concatenate(values, axis=1) for values in zip(*performance_chunks))
+        )
+
+        chiller_totals = integrate(performance, timestep, axis=1)
+        plant_unmet_load = cooling_load - performance.net_evaporator_capacity.sum(
+            axis=0
+        )
+        # Ignore round-off in the load split
+        plant_unmet_load = where(
+            plant_unmet_load > 1e-9 * cooling_load, plant_unmet_load, 0.0
+        )
+        totals = integrate(
+            PartLoadPerformance(
+                *(values.sum(axis=0) for values in performance)
+            )._replace(
+                cooling_load=cooling_load,
+                unmet_load=plant_unmet_load,
+                runtime_fraction=performance.runtime_fraction.max(axis=0),
+            ),
+            timestep,
+        )
+        return PlantSimulationResults(
+            timestep, on, performance, chiller_totals, totals
+        )
+
+    def simulate_block(
+        self,
+        cooling_load: NDArray,
+        evaporator_leaving_temperature: NDArray,
+        condenser_entering_temperature: NDArray,
+    ) -> tuple[NDArray, PartLoadPerformance]:
+        """Whether each chiller is on, and its performance, for 1-D arrays of
+        timesteps"""
+        shape = (len(self.chillers), cooling_load.size)
+
+        # Pass 1: available capacities
+        available_capacity = empty(shape)
+        if self.stack is not None:
+            available_capacity[self.stacked_indices] = self.stack.solve_part_load_ratio(
+                0.0, evaporator_leaving_temperature, condenser_entering_temperature
+            ).available_capacity
+        for index in self.solved_indices:
+            available_capacity[index] = (
+                self.chillers[index]
+                .solve_part_load_ratio(
+                    0.0, evaporator_leaving_temperature, condenser_entering_temperature
+                )
+                .available_capacity
+            )
+        if len(self.staged_indices) > 0:
+            stages = evaluate_chiller_stages(
+                [self.chillers[index] for index in self.staged_indices],
+                evaporator_leaving_temperature,
+                condenser_entering_temperature,
+            )
+            available_capacity[self.staged_indices] = stages.net_evaporator_capacity[-1]
+
+        on = self.staging(cooling_load, available_capacity)
+        chiller_loads = where(
+            on, self.load_split(cooling_load, available_capacity, on), 0.0
+        )
+
+        # Pass 2: performance at each chiller's load
+        performance = PartLoadPerformance(
+            *(empty(shape) for _ in PartLoadPerformance._fields)
+        )
+        if self.stack is not None:
+            loads = chiller_loads[self.stacked_indices]
+            stacked_performance, solution = self.stack.evaluate_load_batch(
+                loads, evaporator_leaving_temperature, condenser_entering_temperature
+            )
+            for values, stacked_values in zip(
+                performance,
+                part_load_performance(
+                    stacked_performance,
+                    loads,
+                    solution.minimum_capacity,
+                    solution.available_capacity,
+                    self.stack.cycling_degradation_coefficient,
+                    self.stack.standby_power,
+                ),
+            ):
+                values[self.stacked_indices] = stacked_values
+        for index in self.solved_indices:
+            chiller = self.chillers[index]
+            chiller_performance, solution = chiller.evaluate_load_batch(
+                chiller_loads[index],
+                evaporator_leaving_temperature,
+                condenser_entering_temperature,
+            )
+            for values, chiller_values in zip(
+                performance,
+                part_load_performance(
+                    chiller_performance,
+                    chiller_loads[index],
+                    solution.minimum_capacity,
+                    solution.available_capacity,
+                    chiller.cycling_degradation_coefficient,
+                    chiller.standby_power,
+                ),
+            ):
+                values[index] = chiller_values
+        if len(self.staged_indices) > 0:
+            staged_chillers = [self.chillers[index] for index in self.staged_indices]
+            for values, staged_values in zip(
+                performance,
+                meet_load_with_stages(
+                    stages,
+                    chiller_loads[self.staged_indices],
+                    asarray(
+                        [chiller.cycling_degradation_coefficient for chiller in staged_chillers]
+                    )[:, None],
+                    asarray([chiller.standby_power for chiller in staged_chillers])[
+                        :, None
+                    ],
+                ),
+            ):
+                values[self.staged_indices] = staged_values
+
+        return on, performance
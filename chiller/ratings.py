@@ -0,0 +1,135 @@
+"""AHRI 550/590 standard ratings: full load efficiency and IPLV / NPLV"""
+
+from typing import NamedTuple
+
+from numpy import asarray, empty, maximum, minimum, where
+from numpy.typing import NDArray
+
+from koozie import fr_u
+
+from .chiller import Chiller, CondenserType
+from .simulation import evaluate_chiller_stages, interpolate_stages
+
+# Rating points (fraction of full load capacity) and their IPLV / NPLV weights
+AHRI_550_590_PART_LOAD_FRACTIONS = (1.0, 0.75, 0.5, 0.25)
+AHRI_550_590_PART_LOAD_WEIGHTS = (0.01, 0.42, 0.45, 0.12)
+
+AHRI_550_590_EVAPORATOR_LEAVING_TEMPERATURE = fr_u(44.0, "°F")
+AHRI_550_590_CONDENSER_ENTERING_TEMPERATURE = fr_u(85.0, "°F")  # Liquid-cooled
+
+
+class ChillerRatings(NamedTuple):
+    """Ratings of one or more chillers (arrays with one value per chiller). Efficiencies
+    are COPs (W/W)."""
+
+    net_evaporator_capacity: NDArray  # Full load
+    cop: NDArray  # Full load
+    part_load_cops: NDArray  # (chillers, rating points)
+    integrated_part_load_value: NDArray  # IPLV, or NPLV at nonstandard conditions
+
+
+def condenser_entering_temperatures(
+    condenser_type: CondenserType,
+    full_load_condenser_entering_temperature: float | None = None,
+) -> NDArray:
+    """Condenser entering temperature (K) at each rating point.
+
+    Liquid-cooled: the entering water temperature varies linearly from the full load
+    value (85 °F for IPLV) at 100% load to 65 °F at 50% load, and is 65 °F below.
+    Air-cooled: the entering air dry-bulb temperature is 95, 80, 65 and 55 °F.
+    """
+    load_fractions = asarray(AHRI_550_590_PART_LOAD_FRACTIONS)
+    if condenser_type == CondenserType.LIQUID:
+        if full_load_condenser_entering_temperature is None:
+            full_load_condenser_entering_temperature = (
+                AHRI_550_590_CONDENSER_ENTERING_TEMPERATURE
+            )
+        return fr_u(65.0, "°F") + (
+            full_load_condenser_entering_temperature - fr_u(65.0, "°F")
+        ) * maximum(2.0 * load_fractions - 1.0, 0.0)
+    if condenser_type == CondenserType.AIR:
+        if full_load_condenser_entering_temperature is not None:
+            raise RuntimeError("NPLV is only defined for liquid-cooled chillers")
+        return maximum(
+            fr_u(35.0, "°F") + fr_u(60.0, "delta_degF") * load_fractions,
+            fr_u(55.0, "°F"),
+        )
+    raise RuntimeError(f"Ratings are not implemented for {condenser_type.name} condensers")
+
+
+def rate_chillers(
+    chillers: list[Chiller],
+    evaporator_leaving_temperature: float = AHRI_550_590_EVAPORATOR_LEAVING_TEMPERATURE,
+    full_load_condenser_entering_temperature: float | None = None,
+) -> ChillerRatings:
+    """Full load COP and IPLV of a batch of chillers (or NPLV of liquid-cooled chillers
+    at a nonstandard leaving chilled water or full load entering condenser water
+    temperature).
+
+    Rating points between two compressor speeds are interpolated between them. Below
+    the lowest speed, the efficiency at the lowest speed is degraded by the AHRI
+    550/590 cycling degradation factor, CD = 1.13 - 0.13 LF, where LF is the load
+    factor (load / capacity at the lowest speed).
+    """
+    number_of_chillers = len(chillers)
+    number_of_points = len(AHRI_550_590_PART_LOAD_FRACTIONS)
+    net_evaporator_capacity = empty(number_of_chillers)
+    part_load_cops = empty((number_of_chillers, number_of_points))
+
+    # Chillers sharing a condenser type share rating conditions
+    for condenser_type in CondenserType:
+        indices = [
+            index
+            for index, chiller in enumerate(chillers)
+            if chiller.condenser_type == condenser_type
+        ]
+        if len(indices) == 0:
+            continue
+        stages = evaluate_chiller_stages(
+            [chillers[index] for index in indices],
+            evaporator_leaving_temperature,
+            condenser_entering_temperatures(
+                condenser_type, full_load_condenser_entering_temperature
+            ),
+        )
+        # Rating point loads are fractions of the full load capacity at 100% conditions
+        full_load_capacity = stages.net_evaporator_capacity[-1, :, 0]
+        loads = full_load_capacity[:, None] * asarray(AHRI_550_590_PART_LOAD_FRACTIONS)
+        performance, _ = interpolate_stages(stages, loads)
+
+        minimum_capacity = stages.net_evaporator_capacity[0]
+        load_factor = minimum(loads / minimum_capacity, 1.0)
+        cycling_degradation = 1.13 - 0.13 * load_factor
+        net_evaporator_capacity[indices] = full_load_capacity
+        part_load_cops[indices] = where(
+            load_factor < 1.0,
+            minimum_capacity / (cycling_degradation * stages.input_power[0]),
+            performance.net_evaporator_capacity / performance.input_power,
+        )
+
+    return ChillerRatings(
+        net_evaporator_capacity=net_evaporator_capacity,
+        cop=part_load_cops[:, 0],
+        part_load_cops=part_load_cops,
+        integrated_part_load_value=part_load_cops
+        @ asarray(AHRI_550_590_PART_LOAD_WEIGHTS),
+    )
+
+
+def rate_chiller(
+    chiller: Chiller,
+    evaporator_leaving_temperature: float = AHRI_550_590_EVAPORATOR_LEAVING_TEMPERATURE,
+    full_load_condenser_entering_temperature: float | None = None,
+) -> ChillerRatings:
+    """'rate_chillers' for a single chiller (with scalar results)"""
+    ratings = rate_chillers(
+        [chiller],
+        evaporator_leaving_temperature,
+        full_load_condenser_entering_temperature,
+    )
+    return ChillerRatings(
+        net_evaporator_capacity=float(ratings.net_evaporator_capacity[0]),
+        cop=float(ratings.cop[0]),
+        part_load_cops=ratings.part_load_cops[0],
+        integrated_part_load_value=float(ratings.integrated_part_load_value[0]),
+    )
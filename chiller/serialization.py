@@ -0,0 +1,426 @@
+"""Streaming writers for ASHRAE 205 representations.
+
+Representations are written without building the serialized document in memory. Large
+arrays may be given as NumPy arrays or SpooledArrays (e.g., lookup variables spooled
+from the evaluation pipeline) and are written in blocks.
+"""
+
+import json
+import os
+from hashlib import sha256
+from shutil import copyfileobj
+from tempfile import SpooledTemporaryFile, mkstemp
+from typing import IO, Iterator
+
+from numpy import (
+    asarray,
+    dtype as numpy_dtype,
+    empty,
+    float64,
+    floating,
+    frombuffer,
+    isfinite,
+    issubdtype,
+    ndarray,
+    number,
+)
+from numpy.typing import DTypeLike, NDArray
+
+FILE_FORMATS = ("json", "yaml", "cbor")
+
+# Number of array values converted at a time while writing
+BLOCK_SIZE = 4096
+
+# Spooled arrays are kept in memory until they exceed this size (bytes)
+SPOOL_MAX_SIZE = 1 << 20
+
+
+class SpooledArray:
+    """One-dimensional array appended in blocks and read back in blocks.
+
+    Values are held in a temporary file that stays in memory until it grows larger than
+    'max_size' bytes.
+    """
+
+    def __init__(self, dtype: DTypeLike, max_size: int = SPOOL_MAX_SIZE):
+        self.dtype = numpy_dtype(dtype)
+        self.file = SpooledTemporaryFile(max_size=max_size)
+        self.length = 0
+
+    def append(self, values: NDArray):
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(values.astype(self.dtype, copy=False).tobytes())
+        self.length += len(values)
+
+    def __len__(self):
+        return self.length
+
+    def blocks(self, block_size: int = BLOCK_SIZE) -> Iterator[NDArray]:
+        self.file.seek(0)
+        for _ in range(0, self.length, block_size):
+            yield frombuffer(
+                self.file.read(block_size * self.dtype.itemsize), dtype=self.dtype
+            )
+
+    def copy_to(self, file: IO[bytes]):
+        """Copy the raw (native byte order) values to a binary file (or other writer)"""
+        self.file.seek(0)
+        copyfileobj(self.file, file)
+
+    def tolist(self) -> list:
+        return [value for block in self.blocks() for value in block.tolist()]
+
+    def close(self):
+        self.file.close()
+
+
+def is_array(value) -> bool:
+    return isinstance(value, (SpooledArray, ndarray))
+
+
+def array_blocks(values, block_size: int = BLOCK_SIZE) -> Iterator[NDArray]:
+    if isinstance(values, SpooledArray):
+        yield from values.blocks(block_size)
+    else:
+        values = values.ravel()
+        for start in range(0, len(values), block_size):
+            yield values[start : start + block_size]
+
+
+def array_length(values) -> int:
+    if isinstance(values, SpooledArray):
+        return len(values)
+    return values.size
+
+
+# JSON (same layout as json.dump(..., indent=4))
+
+
+def dump_json(representation: dict, file: IO[str], indent: int = 4):
+    write_json_value(representation, file, indent, 0)
+    file.flush()
+
+
+def write_json_value(value, file: IO[str], indent: int, level: int):
+    separator = "\n" + " " * (indent * (level + 1))
+    if isinstance(value, dict):
+        if len(value) == 0:
+            file.write("{}")
+            return
+        file.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            file.write(("," if i > 0 else "") + separator + json.dumps(key) + ": ")
+            write_json_value(item, file, indent, level + 1)
+        file.write("\n" + " " * (indent * level) + "}")
+    elif is_array(value):
+        if array_length(value) == 0:
+            file.write("[]")
+            return
+        file.write("[")
+        for i, block in enumerate(array_blocks(value)):
+            if issubdtype(block.dtype, floating) and isfinite(block).all():
+                items = map(float.__repr__, block.tolist())
+            else:
+                items = map(json.dumps, block.tolist())
+            file.write(("," if i > 0 else "") + separator)
+            file.write(("," + separator).join(items))
+        file.write("\n" + " " * (indent * level) + "]")
+    elif isinstance(value, (list, tuple)):
+        if len(value) == 0:
+            file.write("[]")
+            return
+        file.write("[")
+        for i, item in enumerate(value):
+            file.write(("," if i > 0 else "") + separator)
+            write_json_value(item, file, indent, level + 1)
+        file.write("\n" + " " * (indent * level) + "]")
+    else:
+        file.write(json.dumps(value))
+
+
+# YAML (same layout as yaml.dump(..., sort_keys=False), without anchors or aliases)
+
+
+def dump_yaml(representation: dict, file: IO[str]):
+    import yaml
+
+    dumper = yaml.Dumper(file, sort_keys=False)
+    try:
+        dumper.emit(yaml.StreamStartEvent())
+        dumper.emit(yaml.DocumentStartEvent())
+        for event in yaml_events(dumper, representation):
+            dumper.emit(event)
+        dumper.emit(yaml.DocumentEndEvent())
+        dumper.emit(yaml.StreamEndEvent())
+    finally:
+        dumper.dispose()
+
+
+def yaml_events(dumper, value) -> Iterator:
+    import yaml
+
+    if isinstance(value, dict):
+        yield yaml.MappingStartEvent(None, None, True, flow_style=False)
+        for key, item in value.items():
+            yield yaml_scalar_event(dumper, key)
+            yield from yaml_events(dumper, item)
+        yield yaml.MappingEndEvent()
+    elif is_array(value) or isinstance(value, (list, tuple)):
+        # Empty sequences are written in flow style, as by yaml.dump
+        if is_array(value):
+            length = array_length(value)
+        else:
+            length = len(value)
+        yield yaml.SequenceStartEvent(None, None, True, flow_style=length == 0)
+        if is_array(value):
+            for block in array_blocks(value):
+                for item in block.tolist():
+                    yield yaml_scalar_event(dumper, item)
+        else:
+            for item in value:
+                yield from yaml_events(dumper, item)
+        yield yaml.SequenceEndEvent()
+    else:
+        yield yaml_scalar_event(dumper, value)
+
+
+def yaml_scalar_event(dumper, value):
+    import yaml
+
+    node = dumper.represent_data(value)
+    implicit = (
+        node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+        node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True)),
+    )
+    return yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style)
+
+
+# CBOR (same encoding as cbor2.dump, or with RFC 8746 typed arrays)
+
+CBOR_BYTE_STRING = 2
+CBOR_ARRAY = 4
+CBOR_MAP = 5
+CBOR_TAG = 6
+CBOR_FLOAT64 = 0xFB
+
+# RFC 8746 typed array tags (unclamped integers and IEEE 754 floats)
+TYPED_ARRAY_DTYPES = {
+    64: numpy_dtype("u1"),
+    65: numpy_dtype(">u2"),
+    66: numpy_dtype(">u4"),
+    67: numpy_dtype(">u8"),
+    69: numpy_dtype("<u2"),
+    70: numpy_dtype("<u4"),
+    71: numpy_dtype("<u8"),
+    72: numpy_dtype("i1"),
+    73: numpy_dtype(">i2"),
+    74: numpy_dtype(">i4"),
+    75: numpy_dtype(">i8"),
+    77: numpy_dtype("<i2"),
+    78: numpy_dtype("<i4"),
+    79: numpy_dtype("<i8"),
+    80: numpy_dtype(">f2"),
+    81: numpy_dtype(">f4"),
+    82: numpy_dtype(">f8"),
+    84: numpy_dtype("<f2"),
+    85: numpy_dtype("<f4"),
+    86: numpy_dtype("<f8"),
+}
+TYPED_ARRAY_TAGS = {dtype: tag for tag, dtype in TYPED_ARRAY_DTYPES.items()}
+
+
+def dump_cbor(
+    representation: dict,
+    file: IO[bytes],
+    typed_arrays: bool = False,
+    float_dtype: DTypeLike = float64,
+):
+    """Write CBOR. With 'typed_arrays', the lookup variables of performance maps are
+    written as little-endian RFC 8746 typed arrays, with floating point values as
+    'float_dtype'. Everything else (including grid variables) keeps full precision."""
+    import cbor2
+
+    encoder = cbor2.CBOREncoder(file)
+    if typed_arrays:
+        write_cbor_value(encoder, representation, numpy_dtype(float_dtype))
+    else:
+        write_cbor_value(encoder, representation)
+    file.flush()
+
+
+def write_cbor_value(encoder, value, lookup_dtype=None):
+    if isinstance(value, dict):
+        encoder.encode_length(CBOR_MAP, len(value))
+        for key, item in value.items():
+            encoder.encode(key)
+            if (
+                key == "lookup_variables"
+                and lookup_dtype is not None
+                and isinstance(item, dict)
+            ):
+                write_cbor_lookup_variables(encoder, item, lookup_dtype)
+            else:
+                write_cbor_value(encoder, item, lookup_dtype)
+    elif is_array(value):
+        encoder.encode_length(CBOR_ARRAY, array_length(value))
+        for block in array_blocks(value):
+            if issubdtype(block.dtype, floating) and isfinite(block).all():
+                # Each item is a float64 header byte followed by the big-endian value
+                items = empty(len(block), dtype=[("header", "u1"), ("value", ">f8")])
+                items["header"] = CBOR_FLOAT64
+                items["value"] = block
+                encoder.write(items.tobytes())
+            else:
+                for item in block.tolist():
+                    encoder.encode(item)
+    elif isinstance(value, (list, tuple)):
+        encoder.encode_length(CBOR_ARRAY, len(value))
+        for item in value:
+            write_cbor_value(encoder, item, lookup_dtype)
+    else:
+        encoder.encode(value)
+
+
+def write_cbor_lookup_variables(encoder, lookup_variables: dict, float_dtype):
+    """Numeric lookup variables as typed arrays (others, e.g. operation states, as
+    regular CBOR values)"""
+    encoder.encode_length(CBOR_MAP, len(lookup_variables))
+    for name, values in lookup_variables.items():
+        encoder.encode(name)
+        if is_numeric(values):
+            write_cbor_typed_array(encoder, values, float_dtype)
+        else:
+            write_cbor_value(encoder, values)
+
+
+def is_numeric(value) -> bool:
+    if is_array(value):
+        return issubdtype(value.dtype, number)
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) > 0
+        and all(
+            isinstance(item, (int, float)) and not isinstance(item, bool)
+            for item in value
+        )
+    )
+
+
+def write_cbor_typed_array(encoder, values, float_dtype):
+    if not is_array(values):
+        values = asarray(values)
+    if issubdtype(values.dtype, floating):
+        dtype = float_dtype.newbyteorder("<")
+    else:
+        dtype = values.dtype.newbyteorder("<")
+    encoder.encode_length(CBOR_TAG, TYPED_ARRAY_TAGS[dtype])
+    encoder.encode_length(CBOR_BYTE_STRING, array_length(values) * dtype.itemsize)
+    if isinstance(values, SpooledArray):
+        if values.dtype == dtype:
+            values.copy_to(encoder)
+        else:
+            for block in values.blocks():
+                encoder.write(block.astype(dtype).data.cast("B"))
+    else:
+        # No copy when the array is already contiguous with the target type
+        encoder.write(values.astype(dtype, order="C", copy=False).data.cast("B"))
+
+
+def typed_array_tag_hook(decoder, tag):
+    """cbor2 tag hook that reads RFC 8746 typed arrays into (read-only) NumPy arrays"""
+    if not hasattr(tag, "tag"):
+        # cbor2 6 passes (tag, immutable) rather than (decoder, tag)
+        tag = decoder
+    if tag.tag in TYPED_ARRAY_DTYPES:
+        return frombuffer(tag.value, dtype=TYPED_ARRAY_DTYPES[tag.tag])
+    return tag
+
+
+def load_cbor(file: IO[bytes]):
+    import cbor2
+
+    return cbor2.load(file, tag_hook=typed_array_tag_hook)
+
+
+def dump(representation: dict, file: IO, file_format: str, **cbor_options):
+    """Write a representation to an open file (text for JSON and YAML, binary for CBOR).
+
+    'cbor_options' are passed to 'dump_cbor' (e.g., typed_arrays=True).
+    """
+    if file_format == "json":
+        dump_json(representation, file)
+    elif file_format == "yaml":
+        dump_yaml(representation, file)
+    elif file_format == "cbor":
+        dump_cbor(representation, file, **cbor_options)
+    else:
+        raise RuntimeError(
+            f"Unsupported file format '{file_format}'. Use one of {FILE_FORMATS}."
+        )
+
+
+def write_file(
+    representation: dict,
+    file_path: str,
+    file_format: str | None = None,
+    skip_unchanged: bool = False,
+    **cbor_options,
+) -> bool:
+    """Write a representation to a file. The format defaults to the file extension.
+
+    With 'skip_unchanged', the representation is written to a temporary file that only
+    replaces 'file_path' if its content hash differs. Returns whether the file was written.
+    """
+    if file_format is None:
+        file_format = os.path.splitext(file_path)[1][1:]
+    mode = "wb" if file_format == "cbor" else "w"
+    if not skip_unchanged or not os.path.exists(file_path):
+        with open(file_path, mode) as file:
+            dump(representation, file, file_format, **cbor_options)
+        return True
+
+    directory_path, file_name = os.path.split(file_path)
+    file_descriptor, temporary_file_path = mkstemp(
+        prefix=f".{file_name}.", dir=directory_path or None
+    )
+    try:
+        with os.fdopen(file_descriptor, mode) as file:
+            dump(representation, file, file_format, **cbor_options)
+        if file_hash(temporary_file_path) == file_hash(file_path):
+            os.remove(temporary_file_path)
+            return False
+        os.replace(temporary_file_path, file_path)
+        return True
+    except BaseException:
+        if os.path.exists(temporary_file_path):
+            os.remove(temporary_file_path)
+        raise
+
+
+def file_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    content_hash = sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+
+def read_file(file_path: str, file_format: str | None = None) -> dict:
+    """Read a representation. CBOR typed arrays are read as NumPy arrays."""
+    if file_format is None:
+        file_format = os.path.splitext(file_path)[1][1:]
+    if file_format == "json":
+        with open(file_path) as file:
+            return json.load(file)
+    elif file_format == "yaml":
+        import yaml
+
+        with open(file_path) as file:
+            return yaml.safe_load(file)
+    elif file_format == "cbor":
+        with open(file_path, "rb") as file:
+            return load_cbor(file)
+    else:
+        raise RuntimeError(
+            f"Unsupported file format '{file_format}'. Use one of {FILE_FORMATS}."
+        )
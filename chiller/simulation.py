@@ -0,0 +1,344 @@
+from typing import NamedTuple
+
+from numpy import (
+    arange,
+    asarray,
+    broadcast_arrays,
+    broadcast_shapes,
+    broadcast_to,
+    clip,
+    count_nonzero,
+    empty,
+    maximum,
+    minimum,
+    sum as array_sum,
+    where,
+)
+from numpy.typing import ArrayLike, NDArray
+
+from koozie import fr_u
+
+from .chiller import Chiller, ChillerPerformance
+from .models.energyplus_eir import EnergyPlusEIR, EnergyPlusEIRStack
+
+
+class PartLoadPerformance(NamedTuple):
+    """Outputs of a chiller meeting a cooling load (arrays, one value per timestep).
+
+    EnergyPlusEIR chillers meet loads at a continuous part load ratio (see
+    'EnergyPlusEIR.solve_part_load_ratio'); other chillers interpolate between the
+    capacities of the two bracketing compressor speeds. Loads below the minimum
+    capacity are met by cycling at it, with the degradation given by the chiller's
+    'cycling_degradation_coefficient', and the standby power is drawn for the rest of
+    the time. Without a load the chiller is off and only draws the standby power.
+    Loads above the full load capacity are not met.
+    """
+
+    cooling_load: NDArray
+    net_evaporator_capacity: NDArray  # Cooling delivered
+    unmet_load: NDArray
+    available_capacity: NDArray  # Full load capacity at the conditions
+    part_load_ratio: NDArray  # Delivered / available capacity
+    runtime_fraction: NDArray
+    input_power: NDArray  # Including cycling losses and standby power
+    cycling_loss: NDArray  # Power
+    standby_power: NDArray
+    net_condenser_capacity: NDArray
+    oil_cooler_heat: NDArray
+    auxiliary_heat: NDArray
+    space_loss_heat: NDArray
+
+
+class SimulationTotals(NamedTuple):
+    """Time integrals of a simulation (J and s), or arrays of them"""
+
+    cooling_load: float | NDArray
+    net_evaporator_capacity: float | NDArray
+    unmet_load: float | NDArray
+    input_energy: float | NDArray
+    cycling_loss: float | NDArray
+    standby_energy: float | NDArray
+    net_condenser_capacity: float | NDArray
+    operating_time: float | NDArray
+    unmet_load_time: float | NDArray
+
+
+class SimulationResults(NamedTuple):
+    timestep: float  # s
+    performance: PartLoadPerformance
+    totals: SimulationTotals
+
+
+def evaluate_stages(
+    chiller: Chiller,
+    evaporator_leaving_temperature: ArrayLike,
+    condenser_entering_temperature: ArrayLike,
+) -> ChillerPerformance:
+    """Performance at every compressor speed, stacked along a leading axis ordered from
+    the lowest capacity (highest compressor speed index) to full load (speed 0)"""
+    evaporator_leaving_temperature = asarray(evaporator_leaving_temperature, dtype=float)
+    condenser_entering_temperature = asarray(condenser_entering_temperature, dtype=float)
+    compressor_speeds = arange(chiller.number_of_compressor_speeds - 1, -1, -1)
+    # One batch across all speeds
+    performance = chiller.evaluate_batch(
+        evaporator_leaving_temperature,
+        condenser_entering_temperature,
+        compressor_speeds.reshape(
+            (-1,)
+            + (1,)
+            * max(evaporator_leaving_temperature.ndim, condenser_entering_temperature.ndim)
+        ),
+    )
+    shape = (len(compressor_speeds),) + broadcast_shapes(
+        evaporator_leaving_temperature.shape, condenser_entering_temperature.shape
+    )
+    return ChillerPerformance(
+        *(broadcast_to(values, shape) for values in performance)
+    )
+
+
+def evaluate_chiller_stages(
+    chillers: list[Chiller],
+    evaporator_leaving_temperature: ArrayLike,
+    condenser_entering_temperature: ArrayLike,
+) -> ChillerPerformance:
+    """'evaluate_stages' for several chillers at scalar or 1-D conditions.
+
+    Outputs have shape (stages, chillers, conditions). Chillers with fewer compressor
+    speeds repeat their lowest stage. Chillers that can be stacked are evaluated
+    together as one EnergyPlusEIRStack; others are evaluated one chiller at a time.
+    """
+    evaporator_leaving_temperature = asarray(evaporator_leaving_temperature, dtype=float)
+    condenser_entering_temperature = asarray(condenser_entering_temperature, dtype=float)
+    if evaporator_leaving_temperature.ndim > 1 or condenser_entering_temperature.ndim > 1:
+        raise RuntimeError("Conditions must be scalars or 1-D arrays")
+    number_of_conditions = broadcast_shapes(
+        evaporator_leaving_temperature.shape, condenser_entering_temperature.shape, (1,)
+    )[0]
+    number_of_stages = max(chiller.number_of_compressor_speeds for chiller in chillers)
+    stages = ChillerPerformance(
+        *(
+            empty((number_of_stages, len(chillers), number_of_conditions))
+            for _ in ChillerPerformance._fields
+        )
+    )
+
+    stacked_indices = [
+        index
+        for index, chiller in enumerate(chillers)
+        if EnergyPlusEIRStack.can_stack(chiller)
+    ]
+    if len(stacked_indices) == len(chillers):
+        # No copies needed
+        return ChillerPerformance(
+            *(
+                broadcast_to(values, (number_of_stages, len(chillers), number_of_conditions))
+                for values in EnergyPlusEIRStack(chillers).evaluate_stages(
+                    evaporator_leaving_temperature, condenser_entering_temperature
+                )
+            )
+        )
+    if len(stacked_indices) > 0:
+        stacked_stages = EnergyPlusEIRStack(
+            [chillers[index] for index in stacked_indices]
+        ).evaluate_stages(evaporator_leaving_temperature, condenser_entering_temperature)
+        for values, stacked_values in zip(stages, stacked_stages):
+            values[-stacked_values.shape[0] :, stacked_indices] = stacked_values
+            values[: -stacked_values.shape[0], stacked_indices] = stacked_values[0]
+
+    for index, chiller in enumerate(chillers):
+        if index in stacked_indices:
+            continue
+        chiller_stages = evaluate_stages(
+            chiller, evaporator_leaving_temperature, condenser_entering_temperature
+        )
+        for values, chiller_values in zip(stages, chiller_stages):
+            values[-chiller_values.shape[0] :, index] = chiller_values
+            values[: -chiller_values.shape[0], index] = chiller_values[0]
+
+    return stages
+
+
+def interpolate_stages(
+    stages: ChillerPerformance, cooling_load: NDArray
+) -> tuple[ChillerPerformance, NDArray]:
+    """Performance at each cooling load, interpolated between the bracketing stages of
+    'evaluate_stages' (clamped to the lowest and highest stages), and the index of the
+    lower stage"""
+    capacities = stages.net_evaporator_capacity
+    number_of_stages = capacities.shape[0]
+    shape = capacities.shape[1:]
+    cooling_load = broadcast_to(cooling_load, shape)
+    lower = clip(
+        count_nonzero(capacities <= cooling_load, axis=0) - 1,
+        0,
+        max(number_of_stages - 2, 0),
+    )
+    # Flat indices into the stage arrays are faster than 'take_along_axis'
+    stage_size = lower.size
+    lower_index = lower.ravel() * stage_size + arange(stage_size)
+    upper_index = lower_index + (stage_size if number_of_stages > 1 else 0)
+    lower_capacity = capacities.take(lower_index).reshape(shape)
+    span = capacities.take(upper_index).reshape(shape) - lower_capacity
+    fraction = clip(
+        (cooling_load - lower_capacity) / where(span > 0.0, span, 1.0), 0.0, 1.0
+    )
+
+    def interpolate(values):
+        lower_values = values.take(lower_index).reshape(shape)
+        return lower_values + (
+            values.take(upper_index).reshape(shape) - lower_values
+        ) * fraction
+
+    return ChillerPerformance(*(interpolate(values) for values in stages)), lower
+
+
+def meet_load(
+    chiller: Chiller,
+    cooling_load: ArrayLike,
+    evaporator_leaving_temperature: ArrayLike,
+    condenser_entering_temperature: ArrayLike,
+) -> PartLoadPerformance:
+    """Vectorized performance of a chiller meeting cooling loads (W) at chilled water
+    supply (evaporator leaving) and condenser entering temperatures (K)"""
+    (
+        cooling_load,
+        evaporator_leaving_temperature,
+        condenser_entering_temperature,
+    ) = broadcast_arrays(
+        maximum(asarray(cooling_load, dtype=float), 0.0),
+        asarray(evaporator_leaving_temperature, dtype=float),
+        asarray(condenser_entering_temperature, dtype=float),
+    )
+    if isinstance(chiller, EnergyPlusEIR):
+        performance, solution = chiller.evaluate_load_batch(
+            cooling_load, evaporator_leaving_temperature, condenser_entering_temperature
+        )
+        return part_load_performance(
+            performance,
+            cooling_load,
+            solution.minimum_capacity,
+            solution.available_capacity,
+            chiller.cycling_degradation_coefficient,
+            chiller.standby_power,
+        )
+    return meet_load_with_stages(
+        evaluate_stages(
+            chiller, evaporator_leaving_temperature, condenser_entering_temperature
+        ),
+        cooling_load,
+        chiller.cycling_degradation_coefficient,
+        chiller.standby_power,
+    )
+
+
+def meet_load_with_stages(
+    stages: ChillerPerformance,
+    cooling_load: ArrayLike,
+    cycling_degradation_coefficient: ArrayLike,
+    standby_power: ArrayLike,
+) -> PartLoadPerformance:
+    """'meet_load' by interpolating between the performance at each stage (see
+    'evaluate_stages'). The cycling degradation coefficient and standby power are
+    broadcast against the load (e.g., one per chiller)."""
+    cooling_load = maximum(asarray(cooling_load, dtype=float), 0.0)
+    performance, _ = interpolate_stages(stages, cooling_load)
+    return part_load_performance(
+        performance,
+        cooling_load,
+        stages.net_evaporator_capacity[0],
+        stages.net_evaporator_capacity[-1],
+        cycling_degradation_coefficient,
+        standby_power,
+    )
+
+
+def part_load_performance(
+    performance: ChillerPerformance,
+    cooling_load: NDArray,
+    minimum_capacity: NDArray,
+    available_capacity: NDArray,
+    cycling_degradation_coefficient: ArrayLike,
+    standby_power: ArrayLike,
+) -> PartLoadPerformance:
+    """Outputs meeting (non-negative) cooling loads given the steady-state performance
+    at the operating point, which is at the minimum capacity for loads below it"""
+    # Cycling below the minimum capacity. Without a load the chiller is off, which
+    # also covers a minimum capacity of zero (no cycling).
+    cycling_capacity = maximum(minimum_capacity, cooling_load)
+    runtime_fraction = cooling_load / where(cycling_capacity > 0.0, cycling_capacity, 1.0)
+    operating = runtime_fraction > 0.0
+    part_load_factor = 1.0 - cycling_degradation_coefficient * (1.0 - runtime_fraction)
+    steady_power = where(operating, performance.input_power, 0.0) * runtime_fraction
+    operating_power = steady_power / where(operating, part_load_factor, 1.0)
+    cycling_loss = operating_power - steady_power
+    # Heat rejection includes the cycling losses (in proportion to the steady values)
+    steady_heat = performance.net_evaporator_capacity + performance.input_power
+    heat_scale = where(
+        operating,
+        (performance.net_evaporator_capacity * runtime_fraction + operating_power)
+        / where(operating, steady_heat, 1.0),
+        0.0,
+    )
+    standby_power = standby_power * (1.0 - runtime_fraction)
+    net_evaporator_capacity = minimum(cooling_load, available_capacity)
+
+    return PartLoadPerformance(
+        cooling_load=cooling_load,
+        net_evaporator_capacity=net_evaporator_capacity,
+        unmet_load=cooling_load - net_evaporator_capacity,
+        available_capacity=available_capacity,
+        part_load_ratio=net_evaporator_capacity
+        / where(available_capacity > 0.0, available_capacity, 1.0),
+        runtime_fraction=runtime_fraction,
+        input_power=operating_power + standby_power,
+        cycling_loss=cycling_loss,
+        standby_power=standby_power,
+        net_condenser_capacity=performance.net_condenser_capacity * heat_scale,
+        oil_cooler_heat=performance.oil_cooler_heat * heat_scale,
+        auxiliary_heat=performance.auxiliary_heat * heat_scale,
+        space_loss_heat=performance.space_loss_heat * heat_scale,
+    )
+
+
+def simulate(
+    chiller: Chiller,
+    cooling_load: ArrayLike,
+    evaporator_leaving_temperature: ArrayLike,
+    condenser_entering_temperature: ArrayLike,
+    timestep: float = fr_u(1.0, "hr"),
+) -> SimulationResults:
+    """Simulate a chiller over a series of timesteps (e.g., 8760 hours).
+
+    Inputs are the cooling load (W), chilled water supply temperature (K) and
+    condenser entering liquid or air dry-bulb temperature (K) for each timestep of
+    'timestep' seconds. Scalars are broadcast across timesteps.
+    """
+    performance = meet_load(
+        chiller,
+        cooling_load,
+        evaporator_leaving_temperature,
+        condenser_entering_temperature,
+    )
+    totals = integrate(performance, timestep)
+    return SimulationResults(timestep, performance, totals)
+
+
+def integrate(
+    performance: PartLoadPerformance, timestep: float, axis: int | None = None
+) -> SimulationTotals:
+    """Totals over all timesteps, or along one axis (e.g., time, giving totals per
+    chiller)"""
+    return SimulationTotals(
+        cooling_load=array_sum(performance.cooling_load, axis) * timestep,
+        net_evaporator_capacity=array_sum(performance.net_evaporator_capacity, axis)
+        * timestep,
+        unmet_load=array_sum(performance.unmet_load, axis) * timestep,
+        input_energy=array_sum(performance.input_power, axis) * timestep,
+        cycling_loss=array_sum(performance.cycling_loss, axis) * timestep,
+        standby_energy=array_sum(performance.standby_power, axis) * timestep,
+        net_condenser_capacity=array_sum(performance.net_condenser_capacity, axis)
+        * timestep,
+        operating_time=array_sum(performance.runtime_fraction, axis) * timestep,
+        unmet_load_time=count_nonzero(performance.unmet_load > 0.0, axis) * timestep,
+    )
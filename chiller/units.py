@@ -0,0 +1,34 @@
+from koozie import fr_u as koozie_fr_u
+
+
+class UnitConverter:
+    """Affine conversion between SI and another unit, precomputed with koozie.
+
+    Avoids parsing unit strings in hot paths. Values may be scalars or NumPy arrays.
+    """
+
+    __slots__ = ("unit", "scale", "offset")
+
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.offset = koozie_fr_u(0.0, unit)
+        # A large span keeps cancellation error out of the scale for offset units
+        self.scale = (koozie_fr_u(1.0e6, unit) - self.offset) / 1.0e6
+
+    def fr_u(self, value):
+        """Convert from 'unit' to SI"""
+        return value * self.scale + self.offset
+
+    def to_u(self, value):
+        """Convert from SI to 'unit'"""
+        return (value - self.offset) / self.scale
+
+
+celsius = UnitConverter("°C")
+fahrenheit = UnitConverter("°F")
+ton_ref = UnitConverter("ton_ref")
+kilowatt = UnitConverter("kW")
+gallons_per_minute = UnitConverter("gal/min")
+cubic_feet_per_minute = UnitConverter("cfm")
+cfm_per_ton_ref = UnitConverter("cfm/ton_ref")
+gpm_per_ton_ref = UnitConverter("gal/min/ton_ref")
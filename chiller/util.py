@@ -1,33 +1,243 @@
-def calc_biquad(coeff, in_1, in_2):
-    return (
-        coeff[0]
-        + coeff[1] * in_1
-        + coeff[2] * in_1 * in_1
-        + coeff[3] * in_2
-        + coeff[4] * in_2 * in_2
-        + coeff[5] * in_1 * in_2
-    )
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, NamedTuple
 
+from numpy import (
+    array,
+    broadcast,
+    empty_like,
+    flatnonzero,
+    isnan,
+    maximum,
+    minimum,
+    multiply,
+    where,
+    zeros,
+)
+from numpy.typing import NDArray
+
+from . import instrumentation
+
+# Polynomials are evaluated in Horner form. Inputs may be scalars or broadcastable
+# arrays. When 'out' is given, the result is written into it using at most one
+# scratch array ('work', allocated from 'out' when not provided). While instrumented,
+# the number of points evaluated is counted for each curve type.
+
+
+def calc_biquad(coeff, in_1, in_2, out=None, work=None):
+    if instrumentation.active is not None:
+        instrumentation.count("util.calc_biquad", broadcast(in_1, in_2).size)
+    if out is None:
+        return (
+            coeff[0]
+            + in_1 * (coeff[1] + coeff[2] * in_1 + coeff[5] * in_2)
+            + in_2 * (coeff[3] + coeff[4] * in_2)
+        )
+    if work is None:
+        work = empty_like(out)
+    multiply(in_1, coeff[2], out=out)
+    multiply(in_2, coeff[5], out=work)
+    out += work
+    out += coeff[1]
+    out *= in_1
+    multiply(in_2, coeff[4], out=work)
+    work += coeff[3]
+    work *= in_2
+    out += work
+    out += coeff[0]
+    return out
 
-def calc_cubic(coeff, in_1):
-    return (
-        coeff[0]
-        + coeff[1] * in_1
-        + coeff[2] * in_1 * in_1
-        + coeff[3] * in_1 * in_1 * in_1
-    )
 
+def calc_biquad_derivative_in_2(coeff, in_1, in_2):
+    if instrumentation.active is not None:
+        instrumentation.count(
+            "util.calc_biquad_derivative_in_2", broadcast(in_1, in_2).size
+        )
+    return coeff[3] + coeff[5] * in_1 + 2.0 * coeff[4] * in_2
 
-def calc_bicubic(coeff, in_1, in_2):
+
+def calc_cubic(coeff, in_1, out=None):
+    if instrumentation.active is not None:
+        instrumentation.count("util.calc_cubic", broadcast(in_1).size)
+    if out is None:
+        return coeff[0] + in_1 * (coeff[1] + in_1 * (coeff[2] + in_1 * coeff[3]))
+    multiply(in_1, coeff[3], out=out)
+    out += coeff[2]
+    out *= in_1
+    out += coeff[1]
+    out *= in_1
+    out += coeff[0]
+    return out
+
+
+def calc_bicubic(coeff, in_1, in_2, out=None, work=None):
+    if instrumentation.active is not None:
+        instrumentation.count("util.calc_bicubic", broadcast(in_1, in_2).size)
+    if out is None:
+        return (
+            coeff[0]
+            + in_2 * (coeff[3] + in_2 * (coeff[4] + coeff[7] * in_2))
+            + in_1
+            * (
+                coeff[1]
+                + in_2 * (coeff[5] + coeff[9] * in_2)
+                + in_1 * (coeff[2] + coeff[8] * in_2 + coeff[6] * in_1)
+            )
+        )
+    if work is None:
+        work = empty_like(out)
+    multiply(in_1, coeff[6], out=out)
+    multiply(in_2, coeff[8], out=work)
+    out += work
+    out += coeff[2]
+    out *= in_1
+    multiply(in_2, coeff[9], out=work)
+    work += coeff[5]
+    work *= in_2
+    work += coeff[1]
+    out += work
+    out *= in_1
+    multiply(in_2, coeff[7], out=work)
+    work += coeff[4]
+    work *= in_2
+    work += coeff[3]
+    work *= in_2
+    out += work
+    out += coeff[0]
+    return out
+
+
+def calc_bicubic_derivative_in_1(coeff, in_1, in_2):
+    if instrumentation.active is not None:
+        instrumentation.count(
+            "util.calc_bicubic_derivative_in_1", broadcast(in_1, in_2).size
+        )
     return (
-        coeff[0]
-        + coeff[1] * in_1
-        + coeff[2] * in_1 * in_1
-        + coeff[3] * in_2
-        + coeff[4] * in_2 * in_2
-        + coeff[5] * in_1 * in_2
-        + coeff[6] * in_1 * in_1 * in_1
-        + coeff[7] * in_2 * in_2 * in_2
-        + coeff[8] * in_1 * in_1 * in_2
-        + coeff[9] * in_1 * in_2 * in_2
+        coeff[1]
+        + in_2 * (coeff[5] + coeff[9] * in_2)
+        + in_1 * (2.0 * (coeff[2] + coeff[8] * in_2) + 3.0 * coeff[6] * in_1)
     )
+
+
+def solve_bracketed(
+    function: Callable[[NDArray, NDArray], NDArray],
+    target: NDArray,
+    lower: NDArray,
+    upper: NDArray,
+    lower_value: NDArray,
+    upper_value: NDArray,
+    tolerance: float = 1e-10,
+    maximum_iterations: int = 100,
+) -> tuple[NDArray, NDArray, NDArray]:
+    """Solve function(x) = target for 1-D arrays of independent problems bracketed by
+    [lower, upper] (with function values 'lower_value' and 'upper_value').
+
+    Uses the Illinois (modified regula falsi) method. 'function(x, indices)' evaluates
+    the problems at 'indices' only. Each problem stops once its residual is within
+    'tolerance' relative to its target (or to the bracket's values). Returns x, whether
+    each problem converged, and the number of iterations of each.
+    """
+    lower = array(lower, dtype=float)
+    upper = array(upper, dtype=float)
+    lower_residual = lower_value - target
+    upper_residual = upper_value - target
+    scale = maximum(abs(target), maximum(abs(lower_value), abs(upper_value)))
+    x = where(abs(lower_residual) < abs(upper_residual), lower, upper)
+    converged = minimum(abs(lower_residual), abs(upper_residual)) <= tolerance * scale
+    iterations = zeros(x.size, dtype=int)
+    side = zeros(x.size, dtype=int)  # Bound retained in the last step (-1 lower, 1 upper)
+    active = flatnonzero(~converged)
+    for _ in range(maximum_iterations):
+        if active.size == 0:
+            break
+        f_lower = lower_residual[active]
+        f_upper = upper_residual[active]
+        x_new = (lower[active] * f_upper - upper[active] * f_lower) / (f_upper - f_lower)
+        residual = function(x_new, active) - target[active]
+        x[active] = x_new
+        iterations[active] += 1
+
+        # Replace the bound with the same sign. When a bound is retained twice in a
+        # row, its residual is halved (Illinois).
+        replace_lower = (residual < 0.0) == (f_lower < 0.0)
+        lower_active = active[replace_lower]
+        upper_active = active[~replace_lower]
+        lower[lower_active] = x_new[replace_lower]
+        lower_residual[lower_active] = residual[replace_lower]
+        upper[upper_active] = x_new[~replace_lower]
+        upper_residual[upper_active] = residual[~replace_lower]
+        retained_upper = lower_active[side[lower_active] == 1]
+        upper_residual[retained_upper] *= 0.5
+        retained_lower = upper_active[side[upper_active] == -1]
+        lower_residual[retained_lower] *= 0.5
+        side[lower_active] = 1
+        side[upper_active] = -1
+
+        done = abs(residual) <= tolerance * scale[active]
+        converged[active[done]] = True
+        # Problems that cannot be evaluated (NaN) are abandoned
+        active = active[~(done | isnan(residual))]
+
+    if instrumentation.active is not None:
+        instrumentation.count("bracketed.solves", x.size)
+        instrumentation.count("bracketed.iterations", int(iterations.sum()))
+        instrumentation.count("bracketed.failures", int(x.size - converged.sum()))
+
+    return x, converged, iterations
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache with hit/miss statistics"""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
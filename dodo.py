@@ -2,14 +2,31 @@ from doit.tools import create_folder
 
 OUTPUT_PATH = "output"
 
+DOIT_CONFIG = {"default_tasks": ["examples"]}
+
 
 def task_examples():
     """Run examples"""
     create_folder(OUTPUT_PATH)
-    for example in ["generate", "baseline_chillers"]:
+    for example in [
+        "generate",
+        "baseline_chillers",
+        "simulate",
+        "tabular",
+        "batch_solvers",
+    ]:
         yield {
             "name": example,
             "actions": [f"python examples/{example}.py"],
-            "file_dep": [f"examples/{example}.py"],
+            "file_dep": [f"examples/{example}.py", "examples/large_office.py"],
             "clean": True,
         }
+
+
+def task_benchmarks():
+    """Run benchmarks and check for regressions against previous runs"""
+    return {
+        "actions": ["python -m benchmarks.run"],
+        "uptodate": [False],
+        "verbosity": 2,
+    }
@@ -1,12 +1,12 @@
 from chiller import Chiller
+from chiller.library import DATA_VERSION
+from chiller.serialization import write_file
 from chiller.models.ashrae_90_1 import ASHRAE90_1BaselineChiller, CondenserType
+from chiller.ratings import rate_chillers
 from hashlib import sha256
 
 from koozie import fr_u
 
-import yaml
-import cbor2
-import json
 
 """
 # Use to regenerate curve set constructors in ashrae_90_1.py
@@ -37,6 +37,7 @@ with open('examples/90.1-chillers.csv') as file:
 """
 
 
+baseline_chillers = []
 for chiller in ASHRAE90_1BaselineChiller.chiller_curve_sets:
     if chiller.maximum_capacity == float("inf"):
         size = chiller.minimum_capacity + fr_u(50.0, "ton_ref")
@@ -49,6 +50,7 @@ for chiller in ASHRAE90_1BaselineChiller.chiller_curve_sets:
         condenser_type=chiller.condenser_type,
         compressor_type=chiller.compressor_type,
     )
+    baseline_chillers.append(new_chiller)
 
     assert abs(new_chiller.cop() - new_chiller.rated_cop) < 0.05
     assert (
@@ -59,7 +61,7 @@ for chiller in ASHRAE90_1BaselineChiller.chiller_curve_sets:
         < 0.01 * size
     )
 
-    new_chiller.metadata.data_version = 3  # TODO: Update when necessary
+    new_chiller.metadata.data_version = DATA_VERSION
     unique_characteristics = (
         chiller.set_name,
         new_chiller.rated_net_evaporator_capacity,
@@ -68,16 +70,24 @@ for chiller in ASHRAE90_1BaselineChiller.chiller_curve_sets:
         f"{unique_characteristics}".encode()
     ).hexdigest()
 
-    representation = new_chiller.generate_205_representation()
+    representation = new_chiller.generate_205_representation(
+        spool_lookup_variables=True
+    )
 
     output_directory_path = "output"
     file_name = f"ASHRAE90-1-2022-AppJ-Curve-Set-{chiller.set_name}.RS0001.a205"
 
-    # with open(f"{output_directory_path}/{file_name}.yaml", "w") as file:
-    #   yaml.dump(representation, file, sort_keys=False)
+    # for file_format in ["yaml", "cbor"]:
+    #     write_file(representation, f"{output_directory_path}/{file_name}.{file_format}")
 
-    # with open(f"{output_directory_path}/{file_name}.cbor", "wb") as file:
-    #   cbor2.dump(representation, file)
+    write_file(representation, f"{output_directory_path}/{file_name}.json")
 
-    with open(f"{output_directory_path}/{file_name}.json", "w") as file:
-        json.dump(representation, file, indent=4)
+# Standard ratings of the whole library (in one batch) match the curve sets
+ratings = rate_chillers(baseline_chillers)
+for curve_set, cop, iplv in zip(
+    ASHRAE90_1BaselineChiller.chiller_curve_sets,
+    ratings.cop,
+    ratings.integrated_part_load_value,
+):
+    assert abs(cop - curve_set.cop) < 0.05
+    assert abs(iplv - curve_set.iplv) < 0.02 * curve_set.iplv
@@ -0,0 +1,158 @@
+from numpy import array, full, isfinite, isnan, linspace, sqrt, where
+
+from koozie import fr_u
+from scipy import optimize
+
+from chiller.util import solve_bracketed
+
+import large_office
+
+chiller = large_office.make_chiller()
+
+
+def solve_scalar(conditions):
+    """Condenser leaving temperature from the scalar heat balance (SciPy's Newton)"""
+    return optimize.newton(
+        lambda condenser_leaving_temperature: chiller.calculate_condenser_capacity(
+            conditions, condenser_leaving_temperature
+        )
+        - chiller.calculate_condenser_heat_added(
+            conditions, condenser_leaving_temperature
+        ),
+        conditions.condenser_inlet.T,
+        tol=1e-10,
+    )
+
+
+# Batch condenser solutions match the scalar solutions over the rating grid
+grid = chiller.make_condition_grid()
+conditions = list(grid.conditions())
+columns = grid.columns()
+evaporator_leaving_temperature = columns["evaporator_liquid_leaving_temperature"]
+condenser_entering_temperature = columns["condenser_liquid_entering_temperature"]
+compressor_speed = (
+    chiller.number_of_compressor_speeds - columns["compressor_sequence_number"]
+)
+condenser_inlet_capacity_rate = array(
+    [point_conditions.condenser_inlet.c for point_conditions in conditions]
+)
+solution = chiller.solve_condenser_leaving_temperature_batch(
+    evaporator_leaving_temperature,
+    condenser_entering_temperature,
+    condenser_inlet_capacity_rate,
+    compressor_speed,
+)
+scalar_condenser_leaving_temperature = array(
+    [solve_scalar(point_conditions) for point_conditions in conditions]
+)
+assert solution.converged.all()
+assert (
+    abs(solution.condenser_leaving_temperature - scalar_condenser_leaving_temperature)
+    < 1e-6
+).all()
+
+# As do the outputs evaluated from them
+performance = chiller.evaluate_grid(grid)
+for index, point_conditions in enumerate(conditions):
+    net_evaporator_capacity = chiller.calculate_evaporator_capacity(
+        point_conditions, scalar_condenser_leaving_temperature[index]
+    )
+    input_power = chiller.calculate_input_power(
+        point_conditions,
+        scalar_condenser_leaving_temperature[index],
+        chiller.calculate_available_capacity(
+            point_conditions, scalar_condenser_leaving_temperature[index]
+        ),
+    )
+    assert (
+        abs(performance.net_evaporator_capacity[index] - net_evaporator_capacity)
+        < 1e-9 * abs(net_evaporator_capacity)
+    )
+    assert abs(performance.input_power[index] - input_power) < 1e-9 * abs(input_power)
+
+# Points that run out of iterations are flagged, and the others still match
+solution = chiller.solve_condenser_leaving_temperature_batch(
+    evaporator_leaving_temperature,
+    condenser_entering_temperature,
+    condenser_inlet_capacity_rate,
+    compressor_speed,
+    maximum_iterations=2,
+)
+assert not solution.converged.all()
+assert (solution.iterations[~solution.converged] == 2).all()
+assert (
+    abs(
+        solution.condenser_leaving_temperature[solution.converged]
+        - scalar_condenser_leaving_temperature[solution.converged]
+    )
+    < 1e-6
+).all()
+
+# Points without a solution (here, a missing temperature) are flagged and set to NaN
+condenser_entering_temperature = array([fr_u(85.0, "°F"), float("nan")])
+solution = chiller.solve_condenser_leaving_temperature_batch(
+    fr_u(44.0, "°F"),
+    condenser_entering_temperature,
+    chiller.rated_operating_conditions.condenser_inlet.c,
+)
+assert solution.converged.tolist() == [True, False]
+performance = chiller.evaluate_batch(fr_u(44.0, "°F"), condenser_entering_temperature)
+assert all(isfinite(values[0]) and isnan(values[1]) for values in performance)
+part_load_solution = chiller.solve_part_load_ratio(
+    0.5 * chiller.rated_net_evaporator_capacity,
+    fr_u(44.0, "°F"),
+    condenser_entering_temperature,
+)
+assert part_load_solution.converged.tolist() == [True, False]
+
+# Continuous part load ratios match a scalar root finder (SciPy's Brent solver)
+evaporator_leaving_temperature = fr_u(44.0, "°F")
+condenser_entering_temperature = linspace(fr_u(65.0, "°F"), fr_u(95.0, "°F"), 4)
+cooling_load = chiller.rated_net_evaporator_capacity * array([0.05, 0.3, 0.6, 1.2])
+performance, solution = chiller.evaluate_load_batch(
+    cooling_load, evaporator_leaving_temperature, condenser_entering_temperature
+)
+assert solution.converged.all()
+assert solution.part_load_ratio[0] == chiller.minimum_part_load_ratio
+assert solution.part_load_ratio[-1] == 1.0
+for index in [1, 2]:
+    scalar_part_load_ratio = optimize.brentq(
+        lambda part_load_ratio: chiller.evaluate_part_load_ratio_batch(
+            evaporator_leaving_temperature,
+            condenser_entering_temperature[index],
+            part_load_ratio,
+        ).net_evaporator_capacity
+        - cooling_load[index],
+        chiller.minimum_part_load_ratio,
+        1.0,
+        xtol=1e-14,
+    )
+    assert abs(solution.part_load_ratio[index] - scalar_part_load_ratio) < 1e-8
+    assert (
+        abs(performance.net_evaporator_capacity[index] - cooling_load[index])
+        < 1e-9 * cooling_load[index]
+    )
+
+# Bracketed problems that cannot be evaluated (NaN) or run out of iterations are flagged
+target = array([2.0, 3.0, 5.0])
+x, converged, iterations = solve_bracketed(
+    lambda x, active: where(active == 1, float("nan"), x * x),
+    target,
+    full(3, 1.0),
+    full(3, 3.0),
+    full(3, 1.0),
+    full(3, 9.0),
+)
+assert converged.tolist() == [True, False, True]
+assert (abs(x[[0, 2]] - sqrt(target[[0, 2]])) < 1e-9).all()
+_, converged, iterations = solve_bracketed(
+    lambda x, active: x * x,
+    target,
+    full(3, 1.0),
+    full(3, 3.0),
+    full(3, 1.0),
+    full(3, 9.0),
+    maximum_iterations=2,
+)
+assert not converged.any()
+assert (iterations == 2).all()
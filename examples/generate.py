@@ -1,11 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from chiller import Chiller
-from chiller.models import EnergyPlusReformulatedEIR
+from chiller.fluid_properties import LiquidState
+from chiller.serialization import write_file
 
 from koozie import fr_u
 
-import yaml
-import cbor2
-import json
+import large_office
 
 from chiller.models.ashrae_90_1 import (
     ASHRAE90_1BaselineChiller,
@@ -15,52 +16,8 @@ from chiller.models.ashrae_90_1 import (
 )
 
 # From Large Office Reference Building
-size_tons = 40.0
-cop = 5.5
-condenser_type = CondenserType.LIQUID
+my_chiller = large_office.make_chiller()
 subtype = " "
-minimum_part_load_ratio = 0.1
-minimum_unloading_ratio = 0.2
-capacity_temperature_coefficients = [
-    0.9061150,
-    0.0292277,
-    -0.0003647,
-    -0.0009709,
-    -0.0000905,
-    0.0002527,
-]
-eir_temperature_coefficients = [
-    0.3617105,
-    -0.0229833,
-    -0.0009519,
-    0.0131889,
-    0.0003752,
-    -0.0007059,
-]
-eir_part_load_ratio_coefficients = [
-    4.602131e-02,
-    2.433945e-02,
-    6.394526e-05,
-    -3.648563e-01,
-    1.854759e00,
-    -2.809346e-02,
-    0.000000e00,
-    -4.821515e-01,
-    0.000000e00,
-    0.000000e00,
-]
-
-
-my_chiller = EnergyPlusReformulatedEIR(
-    rated_net_evaporator_capacity=fr_u(size_tons, "ton_ref"),
-    rated_cop=cop,
-    condenser_type=condenser_type,
-    minimum_part_load_ratio=minimum_part_load_ratio,
-    minimum_unloading_ratio=minimum_unloading_ratio,
-    capacity_temperature_coefficients=capacity_temperature_coefficients,
-    eir_temperature_coefficients=eir_temperature_coefficients,
-    eir_part_load_ratio_coefficients=eir_part_load_ratio_coefficients,
-)
 
 assert (
     abs(my_chiller.net_evaporator_capacity() - my_chiller.rated_net_evaporator_capacity)
@@ -68,23 +25,34 @@ assert (
 )
 # assert abs(my_chiller.cop() - my_chiller.rated_cop) < 0.05
 
+# The condenser heat balance is solved without evaluating any fluid properties
+property_calls = LiquidState.properties.call_count
+my_chiller.solve_condenser_leaving_temperature_batch(
+    evaporator_leaving_temperature=fr_u([40.0, 44.0, 50.0], "°F"),
+    condenser_entering_temperature=fr_u([65.0, 85.0, 95.0], "°F"),
+    condenser_inlet_capacity_rate=my_chiller.rated_operating_conditions.condenser_inlet.c,
+)
+assert LiquidState.properties.call_count == property_calls
+
+# Blocks of grid points can be evaluated by the workers of an executor
+with ThreadPoolExecutor(4) as executor:
+    pooled_map = my_chiller.make_performance_map(executor, chunk_size=16)
+serial_map = my_chiller.make_performance_map(chunk_size=16)
+assert all(
+    (pooled_map[name] == serial_map[name]).all() for name in serial_map.lookup_variables
+)
+
 my_chiller.metadata.description = (
-    f"{size_tons:.1f} ton, {cop:.2f} COP {condenser_type.name}{subtype}Chiller"
+    f"{large_office.size_tons:.1f} ton, {large_office.cop:.2f} COP {large_office.condenser_type.name}{subtype}Chiller"
 )
 
-representation = my_chiller.generate_205_representation()
+representation = my_chiller.generate_205_representation(spool_lookup_variables=True)
 
 output_directory_path = "output"
 file_name = "Reformulated.RS0001.a205"
 
-with open(f"{output_directory_path}/{file_name}.yaml", "w") as file:
-    yaml.dump(representation, file, sort_keys=False)
-
-with open(f"{output_directory_path}/{file_name}.cbor", "wb") as file:
-    cbor2.dump(representation, file)
-
-with open(f"{output_directory_path}/{file_name}.json", "w") as file:
-    json.dump(representation, file, indent=4)
+for file_format in ["yaml", "cbor", "json"]:
+    write_file(representation, f"{output_directory_path}/{file_name}.{file_format}")
 
 # For Large Office ASHRAE 90.1 Building
 
@@ -96,18 +64,12 @@ new_chiller = ASHRAE90_1BaselineChiller(
     condenser_type=CondenserType.LIQUID,
 )
 
-representation = new_chiller.generate_205_representation()
+representation = new_chiller.generate_205_representation(spool_lookup_variables=True)
 
 file_name = "CoolSys1-Chiller.RS0001.a205"
 
-with open(f"{output_directory_path}/{file_name}.yaml", "w") as file:
-    yaml.dump(representation, file, sort_keys=False)
-
-with open(f"{output_directory_path}/{file_name}.cbor", "wb") as file:
-    cbor2.dump(representation, file)
-
-with open(f"{output_directory_path}/{file_name}.json", "w") as file:
-    json.dump(representation, file, indent=4)
+for file_format in ["yaml", "cbor", "json"]:
+    write_file(representation, f"{output_directory_path}/{file_name}.{file_format}")
 
 new_chiller2 = ASHRAE90_1BaselineChiller(
     rated_net_evaporator_capacity=999070.745,
@@ -122,15 +84,9 @@ new_chiller2 = ASHRAE90_1BaselineChiller(
     path_type=CompliancePathType.PRM,
 )
 
-representation = new_chiller2.generate_205_representation()
+representation = new_chiller2.generate_205_representation(spool_lookup_variables=True)
 
 file_name = "CoolSys1-Chiller-Detailed.RS0001.a205"
 
-with open(f"{output_directory_path}/{file_name}.yaml", "w") as file:
-    yaml.dump(representation, file, sort_keys=False)
-
-with open(f"{output_directory_path}/{file_name}.cbor", "wb") as file:
-    cbor2.dump(representation, file)
-
-with open(f"{output_directory_path}/{file_name}.json", "w") as file:
-    json.dump(representation, file, indent=4)
+for file_format in ["yaml", "cbor", "json"]:
+    write_file(representation, f"{output_directory_path}/{file_name}.{file_format}")
@@ -0,0 +1,54 @@
+"""Chiller of the Large Office Reference Building (shared by the examples and benchmarks)"""
+
+from koozie import fr_u
+
+from chiller.models import EnergyPlusReformulatedEIR
+from chiller.models.ashrae_90_1 import CondenserType
+
+size_tons = 40.0
+cop = 5.5
+condenser_type = CondenserType.LIQUID
+minimum_part_load_ratio = 0.1
+minimum_unloading_ratio = 0.2
+capacity_temperature_coefficients = [
+    0.9061150,
+    0.0292277,
+    -0.0003647,
+    -0.0009709,
+    -0.0000905,
+    0.0002527,
+]
+eir_temperature_coefficients = [
+    0.3617105,
+    -0.0229833,
+    -0.0009519,
+    0.0131889,
+    0.0003752,
+    -0.0007059,
+]
+eir_part_load_ratio_coefficients = [
+    4.602131e-02,
+    2.433945e-02,
+    6.394526e-05,
+    -3.648563e-01,
+    1.854759e00,
+    -2.809346e-02,
+    0.000000e00,
+    -4.821515e-01,
+    0.000000e00,
+    0.000000e00,
+]
+
+
+def make_chiller() -> EnergyPlusReformulatedEIR:
+    """A new chiller with its own copies of the coefficients"""
+    return EnergyPlusReformulatedEIR(
+        rated_net_evaporator_capacity=fr_u(size_tons, "ton_ref"),
+        rated_cop=cop,
+        condenser_type=condenser_type,
+        minimum_part_load_ratio=minimum_part_load_ratio,
+        minimum_unloading_ratio=minimum_unloading_ratio,
+        capacity_temperature_coefficients=list(capacity_temperature_coefficients),
+        eir_temperature_coefficients=list(eir_temperature_coefficients),
+        eir_part_load_ratio_coefficients=list(eir_part_load_ratio_coefficients),
+    )
@@ -0,0 +1,192 @@
+from copy import deepcopy
+from functools import partial
+
+from numpy import arange, clip, cos, count_nonzero, isfinite, pi
+
+from koozie import fr_u, to_u
+
+from chiller.models.ashrae_90_1 import (
+    ASHRAE90_1BaselineChiller,
+    CompliancePathType,
+    CompressorType,
+    CondenserType,
+)
+from chiller.models import EnergyPlusEIR
+from chiller.plant import (
+    Plant,
+    equal_part_load_ratio_split,
+    sequential_split,
+    sequential_staging,
+)
+from chiller.simulation import meet_load, simulate
+
+chiller = ASHRAE90_1BaselineChiller(
+    rated_net_evaporator_capacity=999070.745,
+    rated_cop=5.33,
+    condenser_type=CondenserType.LIQUID,
+    compressor_type=CompressorType.POSITIVE_DISPLACEMENT,
+    cycling_degradation_coefficient=0.25,
+    standby_power=500.0,
+    path_type=CompliancePathType.PRM,
+)
+
+# Synthetic year: seasonal and daily load swings, condenser water following the season
+hours = arange(8760)
+season = 0.5 - 0.5 * cos(2.0 * pi * hours / 8760.0)
+day = 0.5 - 0.5 * cos(2.0 * pi * hours / 24.0)
+cooling_load = (
+    chiller.rated_net_evaporator_capacity
+    * clip(season * (0.4 + 0.7 * day) - 0.05, 0.0, None)
+)
+condenser_entering_temperature = fr_u(65.0, "°F") + season * fr_u(20.0, "delta_degF")
+
+results = simulate(
+    chiller,
+    cooling_load,
+    fr_u(44.0, "°F"),
+    condenser_entering_temperature,
+)
+totals = results.totals
+
+print(f"Cooling delivered: {to_u(totals.net_evaporator_capacity, 'MWh'):.1f} MWh")
+print(f"Input energy: {to_u(totals.input_energy, 'MWh'):.1f} MWh")
+print(f"Cycling losses: {to_u(totals.cycling_loss, 'kWh'):.1f} kWh")
+print(f"Standby energy: {to_u(totals.standby_energy, 'kWh'):.1f} kWh")
+print(f"Unmet load hours: {to_u(totals.unmet_load_time, 'hr'):.0f}")
+
+assert (
+    abs(totals.cooling_load - (totals.net_evaporator_capacity + totals.unmet_load))
+    < 1e-9 * totals.cooling_load
+)
+assert totals.cycling_loss > 0.0
+assert totals.standby_energy > 0.0
+
+# Off: standby power only
+performance = meet_load(chiller, 0.0, fr_u(44.0, "°F"), fr_u(85.0, "°F"))
+assert performance.input_power == chiller.standby_power
+
+# Full load at rated conditions
+performance = meet_load(
+    chiller,
+    chiller.rated_net_evaporator_capacity,
+    fr_u(44.0, "°F"),
+    fr_u(85.0, "°F"),
+)
+assert (
+    abs(performance.input_power - chiller.input_power())
+    < 1e-6 * chiller.input_power()
+)
+
+# Continuous part load: 63% of the rated capacity is met at a single part load ratio
+# (between the compressor speeds of 75% and 50%)
+performance, solution = chiller.evaluate_load_batch(
+    0.63 * chiller.rated_net_evaporator_capacity, fr_u(44.0, "°F"), fr_u(85.0, "°F")
+)
+assert 0.5 < solution.part_load_ratio < 0.75
+assert (
+    abs(performance.net_evaporator_capacity - 0.63 * chiller.rated_net_evaporator_capacity)
+    < 1e-9 * chiller.rated_net_evaporator_capacity
+)
+assert (
+    abs(
+        meet_load(
+            chiller,
+            0.63 * chiller.rated_net_evaporator_capacity,
+            fr_u(44.0, "°F"),
+            fr_u(85.0, "°F"),
+        ).input_power
+        - performance.input_power
+    )
+    < 1e-9 * performance.input_power
+)
+
+# Plant of two baseline chillers and a smaller EIR chiller sharing the load
+small_chiller = EnergyPlusEIR(
+    rated_net_evaporator_capacity=fr_u(100.0, "ton_ref"),
+    rated_cop=5.5,
+    condenser_type=CondenserType.LIQUID,
+    eir_temperature_coefficients=chiller.eir_temperature_coefficients,
+    eir_part_load_ratio_coefficients=chiller.eir_part_load_ratio_coefficients,
+    capacity_temperature_coefficients=chiller.capacity_temperature_coefficients,
+    minimum_part_load_ratio=0.1,
+    minimum_unloading_ratio=0.2,
+)
+plant_load = 2.0 * cooling_load
+for load_split in [equal_part_load_ratio_split, sequential_split]:
+    plant = Plant(
+        [small_chiller, chiller, deepcopy(chiller)],
+        staging=partial(sequential_staging, maximum_part_load_ratio=0.9),
+        load_split=load_split,
+    )
+    plant_results = plant.simulate(
+        plant_load, fr_u(44.0, "°F"), condenser_entering_temperature
+    )
+    print(
+        f"Plant input energy ({load_split.__name__}): {to_u(plant_results.totals.input_energy, 'MWh'):.1f} MWh"
+    )
+    assert (
+        abs(
+            plant_results.totals.net_evaporator_capacity
+            + plant_results.totals.unmet_load
+            - plant_results.totals.cooling_load
+        )
+        < 1e-9 * plant_results.totals.cooling_load
+    )
+    assert (
+        abs(
+            plant_results.chiller_totals.input_energy.sum()
+            - plant_results.totals.input_energy
+        )
+        < 1e-9 * plant_results.totals.input_energy
+    )
+
+# Without a minimum part load ratio, hours without a load are off (standby only)
+unloading_chiller = EnergyPlusEIR(
+    rated_net_evaporator_capacity=fr_u(100.0, "ton_ref"),
+    rated_cop=5.5,
+    condenser_type=CondenserType.LIQUID,
+    eir_temperature_coefficients=chiller.eir_temperature_coefficients,
+    eir_part_load_ratio_coefficients=chiller.eir_part_load_ratio_coefficients,
+    capacity_temperature_coefficients=chiller.capacity_temperature_coefficients,
+    minimum_part_load_ratio=0.0,
+    minimum_unloading_ratio=0.2,
+    cycling_degradation_coefficient=0.25,
+    standby_power=100.0,
+)
+unloading_load = clip(
+    cooling_load, 0.0, 0.5 * unloading_chiller.rated_net_evaporator_capacity
+)
+for unloading_results in [
+    simulate(
+        unloading_chiller,
+        unloading_load,
+        fr_u(44.0, "°F"),
+        condenser_entering_temperature,
+    ),
+    Plant([unloading_chiller, small_chiller]).simulate(
+        unloading_load, fr_u(44.0, "°F"), condenser_entering_temperature
+    ),
+]:
+    assert all(isfinite(unloading_results.totals))
+unloading_totals = simulate(
+    unloading_chiller, unloading_load, fr_u(44.0, "°F"), condenser_entering_temperature
+).totals
+assert (
+    abs(
+        unloading_totals.standby_energy
+        - unloading_chiller.standby_power
+        * count_nonzero(unloading_load == 0.0)
+        * fr_u(1.0, "hr")
+    )
+    < 1e-9 * unloading_totals.standby_energy
+)
+assert unloading_totals.cycling_loss == 0.0
+
+# A single chiller plant is the same as simulating the chiller
+plant_results = Plant([chiller]).simulate(
+    cooling_load, fr_u(44.0, "°F"), condenser_entering_temperature
+)
+assert (
+    abs(plant_results.totals.input_energy - totals.input_energy)
+    < 1e-9 * totals.input_energy
+)
@@ -0,0 +1,86 @@
+from numpy import arange, cos, pi
+
+from koozie import fr_u, to_u
+
+from chiller.models.ashrae_90_1 import (
+    ASHRAE90_1BaselineChiller,
+    CompliancePathType,
+    CompressorType,
+    CondenserType,
+)
+from chiller.models import TabularChiller
+from chiller.plant import Plant
+from chiller.ratings import rate_chiller
+from chiller.serialization import write_file
+from chiller.simulation import simulate
+
+curve_chiller = ASHRAE90_1BaselineChiller(
+    rated_net_evaporator_capacity=999070.745,
+    rated_cop=5.33,
+    condenser_type=CondenserType.LIQUID,
+    compressor_type=CompressorType.POSITIVE_DISPLACEMENT,
+    cycling_degradation_coefficient=0.25,
+    standby_power=500.0,
+    path_type=CompliancePathType.PRM,
+)
+
+# Round trip through an RS0001 file
+file_path = "output/Tabular-Chiller.RS0001.a205.json"
+write_file(curve_chiller.generate_205_representation(), file_path)
+chiller = TabularChiller.from_file(file_path)
+
+assert chiller.number_of_compressor_speeds == curve_chiller.number_of_compressor_speeds
+assert chiller.standby_power == curve_chiller.standby_power
+
+# Grid points are reproduced exactly
+grid = curve_chiller.make_condition_grid()
+for tabular_values, curve_values in zip(
+    chiller.evaluate_grid(grid), curve_chiller.evaluate_grid(grid)
+):
+    assert abs(tabular_values - curve_values).max() <= 1e-9 * abs(curve_values).max()
+
+# Between grid points, the (default 4 x 4 temperature) map is interpolated
+print(f"Rated COP: {chiller.rated_cop:.3f} (curves: {curve_chiller.cop():.3f})")
+assert abs(chiller.rated_cop - curve_chiller.cop()) < 0.05 * curve_chiller.cop()
+
+hours = arange(8760)
+season = 0.5 - 0.5 * cos(2.0 * pi * hours / 8760.0)
+cooling_load = chiller.rated_net_evaporator_capacity * season
+condenser_entering_temperature = (
+    fr_u(65.0, "°F") + season * fr_u(20.0, "delta_degF")
+).round(1)
+
+curve_energy = simulate(
+    curve_chiller, cooling_load, fr_u(44.0, "°F"), condenser_entering_temperature
+).totals.input_energy
+for method in ["linear", "cubic"]:
+    energy = simulate(
+        TabularChiller.from_file(file_path, method=method),
+        cooling_load,
+        fr_u(44.0, "°F"),
+        condenser_entering_temperature,
+    ).totals.input_energy
+    print(
+        f"Input energy ({method}): {to_u(energy, 'MWh'):.1f} MWh (curves: {to_u(curve_energy, 'MWh'):.1f} MWh)"
+    )
+    assert abs(energy - curve_energy) < 0.02 * curve_energy
+
+# Tabular chillers can be rated and combined with curve-based chillers in plants
+ratings = rate_chiller(chiller)
+print(f"IPLV: {ratings.integrated_part_load_value:.2f}")
+assert abs(
+    ratings.integrated_part_load_value
+    - rate_chiller(curve_chiller).integrated_part_load_value
+) < (0.02 * rate_chiller(curve_chiller).integrated_part_load_value)
+
+plant_results = Plant([chiller, curve_chiller]).simulate(
+    2.0 * cooling_load, fr_u(44.0, "°F"), condenser_entering_temperature
+)
+assert (
+    abs(
+        plant_results.totals.net_evaporator_capacity
+        + plant_results.totals.unmet_load
+        - plant_results.totals.cooling_load
+    )
+    < 1e-9 * plant_results.totals.cooling_load
+)